@@ -35,23 +35,47 @@ import logging
 from logging.handlers import SysLogHandler
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from urllib.parse import urlsplit
+from typing import Dict, List, Optional, Set, Tuple, Any
 import json
 import pickle
 import tomli
 import math
 import re
+from collections import Counter
+from operator import attrgetter, itemgetter
 from dataclasses import dataclass, field, asdict
+from functools import lru_cache
 from decimal import Decimal
 import time
 
+try:
+    import orjson  # Optional: faster JSON encode/decode
+except ImportError:
+    orjson = None
+
+try:
+    import uvloop  # Optional: faster event loop (not available on Windows)
+except ImportError:
+    uvloop = None
+
+try:
+    import numpy as np  # Optional: vectorized link distance/bearing
+except ImportError:
+    np = None
+
 
 # ----------------------------------------------------------------------------
 # Firmware classification helpers (mirrors filter.py logic)
 # ----------------------------------------------------------------------------
 
-def version_to_int(version: str) -> Optional[int]:
-    """Convert dotted version string to sortable integer (e.g., 3.25.5.0)."""
+_RE_DOTTED = re.compile(r'\d{1,2}\.\d{1,2}\.\d{1,2}\.\d{1,2}')
+_RE_NIGHTLY = re.compile(r'\d{8}-[0-9a-fA-F]{7,8}')
+
+
+@lru_cache(maxsize=1024)
+def version_to_int(version: str) -> Optional[Tuple[int, int, int, int]]:
+    """Convert dotted version string (e.g., 3.25.5.0) to a sortable 4-tuple."""
     if not version or not isinstance(version, str):
         return None
     parts = version.split('.')
@@ -60,9 +84,10 @@ def version_to_int(version: str) -> Optional[int]:
     except ValueError:
         return None
     parts = parts + [0] * (4 - len(parts))
-    return parts[0] * 1_000_000 + parts[1] * 10_000 + parts[2] * 100 + parts[3]
+    return (parts[0], parts[1], parts[2], parts[3])
 
 
+@lru_cache(maxsize=1024)
 def nightly_to_int(nightly: str) -> Optional[int]:
     """Convert nightly build identifier (YYYYMMDD-hash) to sortable integer."""
     if not nightly or not isinstance(nightly, str):
@@ -75,30 +100,39 @@ def nightly_to_int(nightly: str) -> Optional[int]:
 
 
 def _parse_last_seen(last_seen: Any) -> Optional[float]:
-    """Normalize last_seen to a unix timestamp."""
+    """Normalize last_seen to a unix timestamp (naive values are UTC)."""
+    if isinstance(last_seen, (int, float)):
+        return float(last_seen)
     if isinstance(last_seen, datetime):
+        if last_seen.tzinfo is None:
+            last_seen = last_seen.replace(tzinfo=timezone.utc)
         return last_seen.timestamp()
     if isinstance(last_seen, str):
-        for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f"):
-            try:
-                return datetime.strptime(last_seen, fmt).timestamp()
-            except ValueError:
-                continue
+        dt = None
         try:
-            return datetime.fromisoformat(last_seen).timestamp()
-        except Exception:
+            dt = datetime.fromisoformat(last_seen.replace(' ', 'T', 1))
+        except ValueError:
+            # Fallback for non-ISO inputs
+            for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f"):
+                try:
+                    dt = datetime.strptime(last_seen, fmt)
+                    break
+                except ValueError:
+                    continue
+        if dt is None:
             return None
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.timestamp()
     return None
 
 
 def _to_iso8601_utc(timestamp_value: Any) -> str:
-    """Convert a timestamp (returned in the server's local time) to ISO 8601 UTC.
+    """Convert a timestamp to an ISO 8601 UTC string with trailing Z.
 
-    MariaDB TIMESTAMP columns are stored as UTC but are returned to the session
-    in the session's timezone (commonly the host's local time). We normalize by:
-      1) parsing the local-time string/datetime
-      2) converting to a Unix timestamp (interpreted as local time)
-      3) emitting an explicit UTC ISO 8601 string with trailing Z
+    The database session time zone is pinned to UTC (see MySQLAdapter.connect),
+    so naive datetimes and strings read from TIMESTAMP columns are already UTC
+    and only need formatting. Aware values are converted to UTC.
     Returns empty string if conversion fails.
     """
 
@@ -106,14 +140,13 @@ def _to_iso8601_utc(timestamp_value: Any) -> str:
         return ''
 
     try:
-        # If it's already a datetime object (naive assumed local, aware handled)
+        # If it's already a datetime object (naive assumed UTC, aware handled)
         if isinstance(timestamp_value, datetime):
             if timestamp_value.tzinfo:
                 utc_dt = timestamp_value.astimezone(timezone.utc)
             else:
-                ts = timestamp_value.timestamp()  # treat naive as local time
-                utc_dt = datetime.utcfromtimestamp(ts)
-            return utc_dt.replace(microsecond=0).strftime('%Y-%m-%dT%H:%M:%SZ')
+                utc_dt = timestamp_value
+            return utc_dt.replace(microsecond=0, tzinfo=None).isoformat() + 'Z'
 
         # If it's a string, parse it and convert to UTC
         if isinstance(timestamp_value, str):
@@ -121,30 +154,29 @@ def _to_iso8601_utc(timestamp_value: Any) -> str:
             iso_val = timestamp_value
             if iso_val.endswith('Z'):
                 iso_val = iso_val[:-1] + '+00:00'
-            if 'T' in iso_val and ('+' in iso_val[iso_val.find('T'):] or '-' in iso_val[iso_val.find('T'):]):
-                try:
-                    dt = datetime.fromisoformat(iso_val)
-                    utc_dt = dt.astimezone(timezone.utc)
-                    return utc_dt.replace(microsecond=0).strftime('%Y-%m-%dT%H:%M:%SZ')
-                except ValueError:
-                    pass
+            try:
+                dt = datetime.fromisoformat(iso_val.replace(' ', 'T', 1))
+            except ValueError:
+                dt = None
+                # Fallback for non-ISO inputs
+                for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f"):
+                    try:
+                        dt = datetime.strptime(timestamp_value, fmt)
+                        break
+                    except ValueError:
+                        continue
+                if dt is None:
+                    return ''
 
-            for fmt in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f"):
-                try:
-                    dt = datetime.strptime(timestamp_value, fmt)
-                    ts = dt.timestamp()  # interpret naive as local time
-                    utc_dt = datetime.utcfromtimestamp(ts)
-                    return utc_dt.replace(microsecond=0).strftime('%Y-%m-%dT%H:%M:%SZ')
-                except ValueError:
-                    continue
-            return ''
+            utc_dt = dt.astimezone(timezone.utc) if dt.tzinfo else dt
+            return utc_dt.replace(microsecond=0, tzinfo=None).isoformat() + 'Z'
     except Exception:
         return ''
 
     return ''
 
 
-def _is_firmware(version: str, fw_type: str, version_cutoff: int, nightly_cutoff: int) -> bool:
+def _is_firmware(version: str, fw_type: str, version_cutoff: Tuple[int, int, int, int], nightly_cutoff: int) -> bool:
     """Classify firmware by version string using cutoff rules from filter.py."""
     if not version or not isinstance(version, str):
         return False
@@ -154,34 +186,140 @@ def _is_firmware(version: str, fw_type: str, version_cutoff: int, nightly_cutoff
     if fw_type == 'babel':
         return version.startswith('babel-')
 
+    # Both the dotted and nightly formats start with a digit; nightly builds
+    # have a '-' right after the 8-digit date
     if fw_type == 'olsr':
-        if re.fullmatch(r'^\d{1,2}\.\d{1,2}\.\d{1,2}\.\d{1,2}$', version):
-            v_int = version_to_int(version)
-            return v_int is not None and v_int < version_cutoff
-        if re.fullmatch(r'^\d{8}-[0-9a-fA-F]{7,8}$', version):
+        if not version[:1].isdigit():
+            return False
+        if _RE_DOTTED.fullmatch(version):
+            v_tuple = version_to_int(version)
+            return v_tuple is not None and v_tuple < version_cutoff
+        if version[8:9] == '-' and _RE_NIGHTLY.fullmatch(version):
             n_int = nightly_to_int(version)
             return n_int is not None and n_int < nightly_cutoff
         return False
 
     if fw_type == 'combo':
         # Reject babel-only versions
-        if version.startswith('babel-'):
+        if version.startswith('babel-') or not version[:1].isdigit():
             return False
-        if re.fullmatch(r'^\d{1,2}\.\d{1,2}\.\d{1,2}\.\d{1,2}$', version):
-            v_int = version_to_int(version)
-            return v_int is not None and v_int >= version_cutoff
-        if re.fullmatch(r'^\d{8}-[0-9a-fA-F]{7,8}$', version):
+        if _RE_DOTTED.fullmatch(version):
+            v_tuple = version_to_int(version)
+            return v_tuple is not None and v_tuple >= version_cutoff
+        if version[8:9] == '-' and _RE_NIGHTLY.fullmatch(version):
             n_int = nightly_to_int(version)
             return n_int is not None and n_int >= nightly_cutoff
         return False
 
     return False
 
+
+@lru_cache(maxsize=4096)
+def _firmware_protocol(version: str, version_cutoff: Tuple[int, int, int, int], nightly_cutoff: int) -> str:
+    """Map a firmware version string to its routing protocol label."""
+    if _is_firmware(version, 'babel', version_cutoff, nightly_cutoff):
+        return "Babel Only"
+    if _is_firmware(version, 'olsr', version_cutoff, nightly_cutoff):
+        return "OLSR Only"
+    if _is_firmware(version, 'combo', version_cutoff, nightly_cutoff):
+        return "Combo"
+    return "Unknown"
+
+
+# ----------------------------------------------------------------------------
+# JSON and stored column helpers
+# ----------------------------------------------------------------------------
+
+# <br> tags in node descriptions, replaced with spaces in the data files
+_RE_BR = re.compile(r'<br\s*/?>', re.IGNORECASE)
+
+# Control bytes that some node firmware leaks into its JSON output. Only ASCII
+# is listed: bytes >= 0x80 are part of UTF-8 sequences and must be kept.
+_SCRUB_DELETE = bytes(b for b in range(128) if not (chr(b).isprintable() or chr(b) in '\n\r\t'))
+
+
+def _json_loads(data: Any) -> Any:
+    """Parse JSON from str or bytes, using orjson when available."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # json is more lenient (BOM, NaN/Infinity); give it a try
+            pass
+    return json.loads(data)
+
+
+def _dump_stored(value: Any) -> str:
+    """Serialize a dict/list as compact JSON for storage in a text column."""
+    if orjson is not None:
+        return orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(value, separators=(',', ':'), default=str)
+
+
+def _json_default(obj: Any) -> Any:
+    """Serialize Decimal column values from MariaDB as floats."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+
+
+def _dump_data_file(value: Any) -> bytes:
+    """Serialize a frontend data file as indented UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(value, indent=2, default=_json_default).encode()
+
+
+def _write_file_atomic(path: Path, data: bytes) -> None:
+    """Write data to a temp file beside path, then swap it in with os.replace.
+
+    Readers (the web server) see either the old or the new file, never a
+    partly written one. The new file keeps the old one's permissions (0644
+    for a first write), is synced to disk before the swap, and a failed
+    write leaves no temp file behind.
+    """
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    tmp_path = path.with_name(path.name + '.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        # Set explicitly: the temp file was created under the daemon's umask
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _load_stored(raw: str) -> Any:
+    """Decode a value written by _dump_stored.
+
+    Rows written by older versions hold a hex-encoded pickle instead; those are
+    still decoded so existing databases migrate as rows are rewritten.
+    Returns None if the value cannot be decoded.
+    """
+    # Stored JSON is always an object or array; pickle (protocol 2+) hex
+    # starts with the 0x80 PROTO opcode, so those skip a failed JSON parse
+    if not raw.startswith('80'):
+        try:
+            return _json_loads(raw)
+        except ValueError:
+            pass
+    try:
+        return pickle.loads(bytes.fromhex(raw))
+    except Exception:
+        return None
+
 # ============================================================================
 # Configuration Management
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class NodeInfo:
     """Data class for node information"""
     node: str = ""
@@ -228,55 +366,61 @@ class ConfigManager:
     def __init__(self, config_path: str = "../settings.toml"):
         self.config_path = Path(config_path)
         self.config = self._load_config()
+        # Settings are static after load: serve lookups from a flat snapshot
+        self._values: Dict[Tuple[str, str], Any] = {
+            (section, key): value
+            for section, values in self.config.items() if isinstance(values, dict)
+            for key, value in values.items()
+        }
+        self._converted: Dict[Tuple[str, str, type], Any] = {}
         
     def _load_config(self) -> dict:
         """Load configuration from TOML settings file"""
-        if not self.config_path.exists():
+        try:
+            with open(self.config_path, 'rb') as f:
+                return tomli.load(f)
+        except FileNotFoundError:
             raise FileNotFoundError(
                 f"\nConfiguration file not found: {self.config_path}\n"
-            )
-        with open(self.config_path, 'rb') as f:
-            return tomli.load(f)
+            ) from None
     
     def _strip_quotes(self, value: str) -> str:
         """Remove surrounding quotes from config values (legacy INI compatibility)"""
         if isinstance(value, str):
             value = value.strip()
-            if (value.startswith('"') and value.endswith('"')) or \
-               (value.startswith("'") and value.endswith("'")):
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
                 return value[1:-1]
         return value
     
     def get(self, section: str, key: str, fallback: Any = None) -> Any:
         """Get configuration value with fallback"""
+        # TOML handles booleans natively, no conversion needed
+        return self._values.get((section, key), fallback)
+
+    def _get_converted(self, section: str, key: str, cast: type, fallback: Any) -> Any:
+        """Get a value converted with cast, caching the converted result"""
+        cache_key = (section, key, cast)
+        try:
+            return self._converted[cache_key]
+        except KeyError:
+            pass
+        value = self._values.get((section, key))
+        if value is None:
+            return fallback
         try:
-            if section not in self.config:
-                return fallback
-            value = self.config[section].get(key, fallback)
-            # TOML handles booleans natively, no conversion needed
-            return value
-        except (KeyError, AttributeError):
+            converted = cast(value)
+        except (TypeError, ValueError):
             return fallback
+        self._converted[cache_key] = converted
+        return converted
     
     def getint(self, section: str, key: str, fallback: int = 0) -> int:
         """Get integer configuration value"""
-        try:
-            if section not in self.config:
-                return fallback
-            value = self.config[section].get(key, fallback)
-            return int(value) if value is not None else fallback
-        except (KeyError, AttributeError, ValueError):
-            return fallback
+        return self._get_converted(section, key, int, fallback)
     
     def getfloat(self, section: str, key: str, fallback: float = 0.0) -> float:
         """Get float configuration value"""
-        try:
-            if section not in self.config:
-                return fallback
-            value = self.config[section].get(key, fallback)
-            return float(value) if value is not None else fallback
-        except (KeyError, AttributeError, ValueError):
-            return fallback
+        return self._get_converted(section, key, float, fallback)
 
     def get_section(self, section: str) -> Dict[str, Any]:
         """Return an entire configuration section as a dict."""
@@ -301,6 +445,9 @@ class MySQLAdapter:
                 password=self.config.get('database', 'password', ''),
                 db=self.config.get('database', 'database', 'node_map'),
                 autocommit=True,
+                # Pin the session to UTC so TIMESTAMP columns are read and written
+                # in UTC rather than the server's local time zone
+                init_command="SET time_zone = '+00:00'",
                 minsize=5,
                 maxsize=20
             )
@@ -324,98 +471,132 @@ class MySQLAdapter:
         sql_db_tbl_hops = self.config.get('database', 'table_hops', 'hop_sequences')
         
         async with self.pool.acquire() as conn:
-            # Suppress warnings for "table already exists"
-            async with conn.cursor() as cur_check:
-                await cur_check.execute("SET SESSION sql_notes = 0")
-            
             async with conn.cursor() as cur:
+                # Look up what already exists so a normal startup is one
+                # metadata query instead of a round of DDL statements
+                tables = (sql_db_tbl_node, sql_db_tbl_map, sql_db_tbl_aredn, sql_db_tbl_hops)
+                await cur.execute(
+                    "SELECT table_name FROM information_schema.tables "
+                    "WHERE table_schema = DATABASE() AND table_name IN (%s, %s, %s, %s)",
+                    tables
+                )
+                existing = {row[0] for row in await cur.fetchall()}
+
+                legacy_indexes = set()
+                if sql_db_tbl_node in existing:
+                    await cur.execute(
+                        "SELECT DISTINCT index_name FROM information_schema.statistics "
+                        "WHERE table_schema = DATABASE() AND table_name = %s "
+                        "AND index_name IN ('idx_node', 'idx_hops')",
+                        (sql_db_tbl_node,)
+                    )
+                    legacy_indexes = {row[0] for row in await cur.fetchall()}
+
+                if existing.issuperset(tables) and not legacy_indexes:
+                    logging.info("Database tables verified")
+                    return
+
+                # Suppress warnings for "table already exists"
+                await cur.execute("SET SESSION sql_notes = 0")
+
                 # Create node_info table if not exists
-                await cur.execute(f"""
-                    CREATE TABLE IF NOT EXISTS `{sql_db_tbl_node}` (
-                        `wlan_ip` VARCHAR(45) PRIMARY KEY,
-                        `node` VARCHAR(255) DEFAULT NULL,
-                        `uptime` VARCHAR(255) DEFAULT NULL,
-                        `loadavg` VARCHAR(255) DEFAULT NULL,
-                        `model` VARCHAR(255) DEFAULT NULL,
-                        `firmware_version` VARCHAR(50) DEFAULT NULL,
-                        `ssid` VARCHAR(255) DEFAULT NULL,
-                        `channel` VARCHAR(50) DEFAULT NULL,
-                        `chanbw` VARCHAR(50) DEFAULT NULL,
-                        `tunnel_installed` VARCHAR(10) DEFAULT 'false',
-                        `active_tunnel_count` VARCHAR(10) DEFAULT '0',
-                        `lat` DECIMAL(12,7) DEFAULT 0.0,
-                        `lon` DECIMAL(13,7) DEFAULT 0.0,
-                        `wifi_mac_address` VARCHAR(17) DEFAULT NULL,
-                        `api_version` VARCHAR(50) DEFAULT NULL,
-                        `board_id` VARCHAR(50) DEFAULT NULL,
-                        `firmware_mfg` VARCHAR(100) DEFAULT NULL,
-                        `grid_square` VARCHAR(50) DEFAULT NULL,
-                        `lan_ip` VARCHAR(45) DEFAULT NULL,
-                        `services` TEXT DEFAULT NULL,
-                        `description` TEXT DEFAULT NULL,
-                        `mesh_supernode` VARCHAR(10) DEFAULT 'false',
-                        `mesh_gateway` VARCHAR(10) DEFAULT 'false',
-                        `freq` VARCHAR(50) DEFAULT NULL,
-                        `link_info` MEDIUMTEXT DEFAULT NULL,
-                        `hopsAway` INT DEFAULT 0,
-                        `meshRF` VARCHAR(10) DEFAULT 'on',
-                        `last_seen` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                        `antGain` DECIMAL(5,2) DEFAULT 0,
-                        `antBeam` DECIMAL(5,2) DEFAULT 0,
-                        `antDesc` VARCHAR(255) DEFAULT NULL,
-                        `antBuiltin` VARCHAR(10) DEFAULT 'false',
-                        `response_time_ms` FLOAT DEFAULT 0.0,
-                        INDEX `idx_node` (`node`),
-                        INDEX `idx_hops` (`hopsAway`),
-                        INDEX `idx_last_seen` (`last_seen`)
-                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-                """)
-                
+                if sql_db_tbl_node not in existing:
+                    await cur.execute(f"""
+                        CREATE TABLE IF NOT EXISTS `{sql_db_tbl_node}` (
+                            `wlan_ip` VARCHAR(45) PRIMARY KEY,
+                            `node` VARCHAR(255) DEFAULT NULL,
+                            `uptime` VARCHAR(255) DEFAULT NULL,
+                            `loadavg` VARCHAR(255) DEFAULT NULL,
+                            `model` VARCHAR(255) DEFAULT NULL,
+                            `firmware_version` VARCHAR(50) DEFAULT NULL,
+                            `ssid` VARCHAR(255) DEFAULT NULL,
+                            `channel` VARCHAR(50) DEFAULT NULL,
+                            `chanbw` VARCHAR(50) DEFAULT NULL,
+                            `tunnel_installed` VARCHAR(10) DEFAULT 'false',
+                            `active_tunnel_count` VARCHAR(10) DEFAULT '0',
+                            `lat` DECIMAL(12,7) DEFAULT 0.0,
+                            `lon` DECIMAL(13,7) DEFAULT 0.0,
+                            `wifi_mac_address` VARCHAR(17) DEFAULT NULL,
+                            `api_version` VARCHAR(50) DEFAULT NULL,
+                            `board_id` VARCHAR(50) DEFAULT NULL,
+                            `firmware_mfg` VARCHAR(100) DEFAULT NULL,
+                            `grid_square` VARCHAR(50) DEFAULT NULL,
+                            `lan_ip` VARCHAR(45) DEFAULT NULL,
+                            `services` TEXT DEFAULT NULL,
+                            `description` TEXT DEFAULT NULL,
+                            `mesh_supernode` VARCHAR(10) DEFAULT 'false',
+                            `mesh_gateway` VARCHAR(10) DEFAULT 'false',
+                            `freq` VARCHAR(50) DEFAULT NULL,
+                            `link_info` MEDIUMTEXT DEFAULT NULL,
+                            `hopsAway` INT DEFAULT 0,
+                            `meshRF` VARCHAR(10) DEFAULT 'on',
+                            `last_seen` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                            `antGain` DECIMAL(5,2) DEFAULT 0,
+                            `antBeam` DECIMAL(5,2) DEFAULT 0,
+                            `antDesc` VARCHAR(255) DEFAULT NULL,
+                            `antBuiltin` VARCHAR(10) DEFAULT 'false',
+                            `response_time_ms` FLOAT DEFAULT 0.0,
+                            INDEX `idx_last_seen` (`last_seen`)
+                        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                    """)
+
+                # Reads are full scans or by primary key; the only secondary
+                # lookup is the last_seen retention purge. Drop the old node
+                # and hopsAway indexes so upserts don't maintain them.
+                if legacy_indexes:
+                    await cur.execute(f"""
+                        ALTER TABLE `{sql_db_tbl_node}`
+                        DROP INDEX IF EXISTS `idx_node`,
+                        DROP INDEX IF EXISTS `idx_hops`
+                    """)
+
                 # Create map_info table if not exists
-                await cur.execute(f"""
-                    CREATE TABLE IF NOT EXISTS `{sql_db_tbl_map}` (
-                        `id` VARCHAR(50) PRIMARY KEY,
-                        `numParallelThreads` INT DEFAULT 0,
-                        `nodeTotal` INT DEFAULT 0,
-                        `garbageReturned` INT DEFAULT 0,
-                        `highestHops` INT DEFAULT 0,
-                        `totalPolled` INT DEFAULT 0,
-                        `noLocation` INT DEFAULT 0,
-                        `mappableNodes` INT DEFAULT 0,
-                        `mappableLinks` INT DEFAULT 0,
-                        `pollingTimeSec` DECIMAL(10,2) DEFAULT 0,
-                        `lastPollingRun` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-                """)
-                
+                if sql_db_tbl_map not in existing:
+                    await cur.execute(f"""
+                        CREATE TABLE IF NOT EXISTS `{sql_db_tbl_map}` (
+                            `id` VARCHAR(50) PRIMARY KEY,
+                            `numParallelThreads` INT DEFAULT 0,
+                            `nodeTotal` INT DEFAULT 0,
+                            `garbageReturned` INT DEFAULT 0,
+                            `highestHops` INT DEFAULT 0,
+                            `totalPolled` INT DEFAULT 0,
+                            `noLocation` INT DEFAULT 0,
+                            `mappableNodes` INT DEFAULT 0,
+                            `mappableLinks` INT DEFAULT 0,
+                            `pollingTimeSec` DECIMAL(10,2) DEFAULT 0,
+                            `lastPollingRun` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                    """)
+
                 # Create aredn_info table if not exists
-                await cur.execute(f"""
-                    CREATE TABLE IF NOT EXISTS `{sql_db_tbl_aredn}` (
-                        `id` INT AUTO_INCREMENT PRIMARY KEY,
-                        `version_type` VARCHAR(50) DEFAULT NULL,
-                        `version` VARCHAR(50) DEFAULT NULL,
-                        `updated` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
-                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-                """)
-                
+                if sql_db_tbl_aredn not in existing:
+                    await cur.execute(f"""
+                        CREATE TABLE IF NOT EXISTS `{sql_db_tbl_aredn}` (
+                            `id` INT AUTO_INCREMENT PRIMARY KEY,
+                            `version_type` VARCHAR(50) DEFAULT NULL,
+                            `version` VARCHAR(50) DEFAULT NULL,
+                            `updated` TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                    """)
+
                 # Create hop_sequences table if not exists
-                await cur.execute(f"""
-                    CREATE TABLE IF NOT EXISTS `{sql_db_tbl_hops}` (
-                        `id` BIGINT AUTO_INCREMENT PRIMARY KEY,
-                        `node_ip` VARCHAR(45) NOT NULL,
-                        `measured_at` TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3),
-                        `hop_count` INT DEFAULT 0,
-                        `hop_sequence` TEXT NOT NULL,
-                        `measurement_time_ms` FLOAT DEFAULT 0.0,
-                        INDEX `idx_node_ip` (`node_ip`),
-                        INDEX `idx_measured_at` (`measured_at`)
-                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
-                """)
-                
-            # Re-enable warnings
-            async with conn.cursor() as cur_check:
-                await cur_check.execute("SET SESSION sql_notes = 1")
-                
+                if sql_db_tbl_hops not in existing:
+                    await cur.execute(f"""
+                        CREATE TABLE IF NOT EXISTS `{sql_db_tbl_hops}` (
+                            `id` BIGINT AUTO_INCREMENT PRIMARY KEY,
+                            `node_ip` VARCHAR(45) NOT NULL,
+                            `measured_at` TIMESTAMP(3) DEFAULT CURRENT_TIMESTAMP(3),
+                            `hop_count` INT DEFAULT 0,
+                            `hop_sequence` TEXT NOT NULL,
+                            `measurement_time_ms` FLOAT DEFAULT 0.0,
+                            INDEX `idx_node_ip` (`node_ip`),
+                            INDEX `idx_measured_at` (`measured_at`)
+                        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+                    """)
+
+                # Re-enable warnings
+                await cur.execute("SET SESSION sql_notes = 1")
+
             logging.info("Database tables verified/created successfully")
 
     async def close(self):
@@ -425,105 +606,193 @@ class MySQLAdapter:
             await self.pool.wait_closed()
             logging.info("MariaDB connection closed")
 
+    UPSERT_NODE_SQL = """
+        INSERT INTO node_info (
+            node, wlan_ip, uptime, loadavg, model, firmware_version,
+            ssid, channel, chanbw, tunnel_installed, active_tunnel_count,
+            lat, lon, wifi_mac_address, api_version, board_id,
+            firmware_mfg, grid_square, lan_ip, services, description,
+            mesh_supernode, mesh_gateway, freq, link_info, hopsAway,
+            meshRF, last_seen, antGain, antBeam, antDesc, antBuiltin, response_time_ms
+        ) VALUES (
+            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+            %s, %s, %s, %s, %s
+        ) ON DUPLICATE KEY UPDATE
+            node=VALUES(node), uptime=VALUES(uptime), loadavg=VALUES(loadavg),
+            model=VALUES(model), firmware_version=VALUES(firmware_version),
+            ssid=VALUES(ssid), channel=VALUES(channel), chanbw=VALUES(chanbw),
+            tunnel_installed=VALUES(tunnel_installed),
+            active_tunnel_count=VALUES(active_tunnel_count), lat=VALUES(lat),
+            lon=VALUES(lon), wifi_mac_address=VALUES(wifi_mac_address),
+            api_version=VALUES(api_version), board_id=VALUES(board_id),
+            firmware_mfg=VALUES(firmware_mfg), grid_square=VALUES(grid_square),
+            lan_ip=VALUES(lan_ip), services=VALUES(services),
+            description=VALUES(description), mesh_supernode=VALUES(mesh_supernode),
+            mesh_gateway=VALUES(mesh_gateway), freq=VALUES(freq),
+            link_info=COALESCE(VALUES(link_info), link_info), hopsAway=VALUES(hopsAway),
+            meshRF=VALUES(meshRF), last_seen=VALUES(last_seen), antGain=VALUES(antGain),
+            antBeam=VALUES(antBeam), antDesc=VALUES(antDesc),
+            antBuiltin=VALUES(antBuiltin), response_time_ms=VALUES(response_time_ms)
+    """
+
+    @staticmethod
+    def _node_row(node_data: NodeInfo) -> Tuple:
+        """Build the UPSERT_NODE_SQL parameter tuple for a node"""
+        services = node_data.services if node_data.services else ""
+        link_info = node_data.link_info if node_data.link_info else None
+        loadavg = node_data.loadavg if node_data.loadavg else ""
+        last_seen_val = node_data.last_seen if node_data.last_seen else None
+
+        # Round lat/lon to 7 decimal places to avoid truncation warnings
+        if node_data.lat is not None:
+            node_data.lat = round(node_data.lat, 7)
+        if node_data.lon is not None:
+            node_data.lon = round(node_data.lon, 7)
+
+        # Validate and warn about lat/lon values
+        if node_data.lat is not None and (node_data.lat < -90 or node_data.lat > 90):
+            logging.warning(f"Invalid lat value for node {node_data.node}: {node_data.lat} (should be -90 to 90). Data: node={node_data.node}, lat={node_data.lat}, lon={node_data.lon}")
+        if node_data.lon is not None and (node_data.lon < -180 or node_data.lon > 180):
+            logging.warning(f"Invalid lon value for node {node_data.node}: {node_data.lon} (should be -180 to 180). Data: node={node_data.node}, lat={node_data.lat}, lon={node_data.lon}")
+
+        return (
+            node_data.node, node_data.wlan_ip, node_data.uptime, loadavg,
+            node_data.model, node_data.firmware_version, node_data.ssid,
+            node_data.channel, node_data.chanbw, node_data.tunnel_installed,
+            node_data.active_tunnel_count, node_data.lat, node_data.lon,
+            node_data.wifi_mac_address, node_data.api_version,
+            node_data.board_id, node_data.firmware_mfg, node_data.grid_square,
+            node_data.lan_ip, services, node_data.description,
+            node_data.mesh_supernode, node_data.mesh_gateway, node_data.freq,
+            link_info, node_data.hopsAway, node_data.meshRF,
+            last_seen_val, node_data.antGain, node_data.antBeam, node_data.antDesc,
+            node_data.antBuiltin, node_data.response_time_ms
+        )
+
     async def upsert_node(self, node_data: NodeInfo):
         """Insert or update node in database"""
+        values = self._node_row(node_data)
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cur:
-                services = node_data.services if node_data.services else ""
-                link_info_insert = node_data.link_info if node_data.link_info else None
-                link_info_update = node_data.link_info if node_data.link_info else None
-                loadavg = node_data.loadavg if node_data.loadavg else ""
-                last_seen_val = node_data.last_seen if node_data.last_seen else None
-
-                # Round lat/lon to 7 decimal places to avoid truncation warnings
-                if node_data.lat is not None:
-                    node_data.lat = round(node_data.lat, 7)
-                if node_data.lon is not None:
-                    node_data.lon = round(node_data.lon, 7)
-
-                # Validate and warn about lat/lon values
-                if node_data.lat is not None and (node_data.lat < -90 or node_data.lat > 90):
-                    logging.warning(f"Invalid lat value for node {node_data.node}: {node_data.lat} (should be -90 to 90). Data: node={node_data.node}, lat={node_data.lat}, lon={node_data.lon}")
-                if node_data.lon is not None and (node_data.lon < -180 or node_data.lon > 180):
-                    logging.warning(f"Invalid lon value for node {node_data.node}: {node_data.lon} (should be -180 to 180). Data: node={node_data.node}, lat={node_data.lat}, lon={node_data.lon}")
-
-                sql = """
-                    INSERT INTO node_info (
-                        node, wlan_ip, uptime, loadavg, model, firmware_version,
-                        ssid, channel, chanbw, tunnel_installed, active_tunnel_count,
-                        lat, lon, wifi_mac_address, api_version, board_id,
-                        firmware_mfg, grid_square, lan_ip, services, description,
-                        mesh_supernode, mesh_gateway, freq, link_info, hopsAway,
-                        meshRF, last_seen, antGain, antBeam, antDesc, antBuiltin, response_time_ms
-                    ) VALUES (
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
-                        %s, %s, %s, %s, %s
-                    ) ON DUPLICATE KEY UPDATE
-                        node=%s, uptime=%s, loadavg=%s, model=%s, firmware_version=%s,
-                        ssid=%s, channel=%s, chanbw=%s, tunnel_installed=%s,
-                        active_tunnel_count=%s, lat=%s, lon=%s, wifi_mac_address=%s,
-                        api_version=%s, board_id=%s, firmware_mfg=%s, grid_square=%s,
-                        lan_ip=%s, services=%s, description=%s, mesh_supernode=%s,
-                        mesh_gateway=%s, freq=%s, link_info=COALESCE(%s, link_info), hopsAway=%s,
-                        meshRF=%s, last_seen=%s, antGain=%s, antBeam=%s,
-                        antDesc=%s, antBuiltin=%s, response_time_ms=%s
-                """
-
-                values = (
-                    node_data.node, node_data.wlan_ip, node_data.uptime, loadavg,
-                    node_data.model, node_data.firmware_version, node_data.ssid,
-                    node_data.channel, node_data.chanbw, node_data.tunnel_installed,
-                    node_data.active_tunnel_count, node_data.lat, node_data.lon,
-                    node_data.wifi_mac_address, node_data.api_version,
-                    node_data.board_id, node_data.firmware_mfg, node_data.grid_square,
-                    node_data.lan_ip, services, node_data.description,
-                    node_data.mesh_supernode, node_data.mesh_gateway, node_data.freq,
-                    link_info_insert, node_data.hopsAway, node_data.meshRF,
-                    last_seen_val, node_data.antGain, node_data.antBeam, node_data.antDesc,
-                    node_data.antBuiltin, node_data.response_time_ms,
-                    node_data.node, node_data.uptime, loadavg, node_data.model,
-                    node_data.firmware_version, node_data.ssid, node_data.channel,
-                    node_data.chanbw, node_data.tunnel_installed,
-                    node_data.active_tunnel_count, node_data.lat, node_data.lon,
-                    node_data.wifi_mac_address, node_data.api_version,
-                    node_data.board_id, node_data.firmware_mfg, node_data.grid_square,
-                    node_data.lan_ip, services, node_data.description,
-                    node_data.mesh_supernode, node_data.mesh_gateway, node_data.freq,
-                    link_info_update, node_data.hopsAway, node_data.meshRF,
-                    last_seen_val, node_data.antGain, node_data.antBeam, node_data.antDesc,
-                    node_data.antBuiltin, node_data.response_time_ms
-                )
-
                 try:
-                    await cur.execute(sql, values)
+                    await cur.execute(self.UPSERT_NODE_SQL, values)
                 except Exception as e:
                     logging.error(f"Failed to upsert node {node_data.node}: {e}")
                     logging.error(f"Node data: node={node_data.node}, lat={node_data.lat}, lon={node_data.lon}, wlan_ip={node_data.wlan_ip}")
                     raise
 
+    # MariaDB error codes that abort the batch write entirely
+    CONNECTION_LOST_ERRORS = frozenset({2006, 2013})  # server gone away, lost connection
+    # Lock conflicts between concurrent batches; the whole statement is safe to re-run
+    LOCK_CONFLICT_ERRORS = frozenset({1205, 1213})  # lock wait timeout, deadlock
+    BATCH_LOCK_RETRIES = 3
+
+    @staticmethod
+    def _error_code(error: BaseException) -> Optional[int]:
+        """Return the MariaDB error number carried by a driver exception, if any"""
+        code = error.args[0] if error.args else None
+        return code if isinstance(code, int) else None
+
+    async def _executemany_or_per_row(self, sql: str, rows: List[Tuple], keys: List[str], what: str) -> int:
+        """Run sql as one multi-row statement, falling back to one row at a time
+
+        A failed multi-row statement is rolled back as a whole, so one bad row
+        would otherwise lose the entire batch. A deadlock or lock wait timeout
+        re-runs the whole statement after a short pause; any other failure
+        retries every row on its own and only the rows that fail again are
+        logged and dropped. Returns the number of rows that could not be written.
+        """
+        async with self.pool.acquire() as conn:
+            async with conn.cursor() as cur:
+                for attempt in range(self.BATCH_LOCK_RETRIES + 1):
+                    try:
+                        await cur.executemany(sql, rows)
+                        return 0
+                    except Exception as e:
+                        code = self._error_code(e)
+                        if code in self.CONNECTION_LOST_ERRORS:
+                            raise
+                        if code in self.LOCK_CONFLICT_ERRORS and attempt < self.BATCH_LOCK_RETRIES:
+                            logging.warning(f"Batch {what} of {len(rows)} rows hit lock conflict ({e}); retrying")
+                            await asyncio.sleep(0.1 * (attempt + 1))
+                            continue
+                        logging.warning(f"Batch {what} of {len(rows)} rows failed ({e}); retrying row by row")
+                        break
+
+                failed = 0
+                for key, row in zip(keys, rows):
+                    try:
+                        await cur.execute(sql, row)
+                    except Exception as e:
+                        if self._error_code(e) in self.CONNECTION_LOST_ERRORS:
+                            raise
+                        failed += 1
+                        logging.error(f"Failed {what} for {key}: {e}")
+                if failed:
+                    logging.error(f"{failed} of {len(rows)} rows failed {what}")
+                return failed
+
+    async def upsert_nodes_batch(self, nodes: List[NodeInfo]) -> int:
+        """Insert or update many nodes using a single multi-row statement
+
+        Returns the number of nodes that could not be written.
+        """
+        if not nodes:
+            return 0
+        rows = [self._node_row(n) for n in nodes]
+        return await self._executemany_or_per_row(
+            self.UPSERT_NODE_SQL, rows, [n.wlan_ip for n in nodes], 'node upsert'
+        )
+
     async def update_link_info(self, wlan_ip: str, link_data: Dict):
         """Update link information for a node"""
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cur:
-                link_str = pickle.dumps(link_data).hex()
+                link_str = _dump_stored(link_data)
                 sql = "UPDATE node_info SET link_info = %s WHERE wlan_ip = %s"
                 await cur.execute(sql, (link_str, wlan_ip))
 
+    async def update_link_info_batch(self, items: List[Tuple[str, str]]) -> int:
+        """Update link information for many nodes from (wlan_ip, serialized links) pairs
+
+        Returns the number of nodes whose link information could not be written.
+        """
+        if not items:
+            return 0
+        sql = """
+            INSERT INTO node_info (wlan_ip, link_info) VALUES (%s, %s)
+            ON DUPLICATE KEY UPDATE link_info=VALUES(link_info)
+        """
+        return await self._executemany_or_per_row(
+            sql, items, [wlan_ip for wlan_ip, _ in items], 'link info update'
+        )
+
+    # Columns read back by the link topology and data file builders
+    NODE_READ_COLUMNS = (
+        'wlan_ip', 'node', 'uptime', 'loadavg', 'model', 'firmware_version',
+        'ssid', 'channel', 'chanbw', 'active_tunnel_count', 'lat', 'lon',
+        'board_id', 'firmware_mfg', 'grid_square', 'services', 'description',
+        'mesh_supernode', 'mesh_gateway', 'freq', 'link_info', 'hopsAway',
+        'meshRF', 'last_seen', 'antGain', 'antBeam', 'antDesc', 'response_time_ms',
+    )
+
     async def get_all_nodes(self) -> List[Dict]:
-        """Retrieve all nodes"""
+        """Retrieve all nodes as a list of column -> value dicts"""
+        import aiomysql
+        columns = ', '.join(f"`{c}`" for c in self.NODE_READ_COLUMNS)
         async with self.pool.acquire() as conn:
-            async with conn.cursor() as cur:
-                await cur.execute("SELECT * FROM node_info")
-                columns = [desc[0] for desc in cur.description]
+            # DictCursor builds the row dicts directly, avoiding a second list
+            async with conn.cursor(aiomysql.DictCursor) as cur:
+                await cur.execute(f"SELECT {columns} FROM node_info")
                 rows = await cur.fetchall()
-                return [dict(zip(columns, row)) for row in rows] if rows else []
+                return rows if rows else []
 
     async def mark_node_inactive(self, wlan_ip: str):
         """Clear link info for inactive node"""
         async with self.pool.acquire() as conn:
             async with conn.cursor() as cur:
-                empty_link = pickle.dumps({}).hex()
+                empty_link = _dump_stored({})
                 sql = "UPDATE node_info SET link_info = %s WHERE wlan_ip = %s"
                 await cur.execute(sql, (empty_link, wlan_ip))
 
@@ -607,82 +876,223 @@ class MySQLAdapter:
 # Network Polling
 # ============================================================================
 
+# ----------------------------------------------------------------------------
+# sysinfo section parsers (nested objects read by _parse_sysinfo)
+# ----------------------------------------------------------------------------
+
+_TRUTHY = frozenset({1, '1', True, 'true'})
+
+
+def _as_bool_str(value: Any) -> str:
+    """Coerce a sysinfo flag to the 'true'/'false' strings stored in the DB"""
+    return 'true' if value in _TRUTHY else 'false'
+
+
+def _parse_sysinfo_block(ni: NodeInfo, value: Dict):
+    """Nested sysinfo object with uptime and loads"""
+    if 'uptime' in value:
+        ni.uptime = str(value['uptime'])
+    loads = value.get('loads')
+    if isinstance(loads, list):
+        ni.loadavg = _dump_stored(loads)
+
+
+def _parse_node_details(ni: NodeInfo, value: Dict):
+    """node_details object (older API format)"""
+    if 'model' in value:
+        ni.model = value['model']
+    if 'board_id' in value:
+        ni.board_id = value['board_id']
+    if 'firmware_version' in value:
+        ni.firmware_version = value['firmware_version']
+    if 'firmware_mfg' in value:
+        ni.firmware_mfg = value['firmware_mfg']
+    if 'description' in value:
+        ni.description = value['description']
+    if 'mesh_gateway' in value:
+        ni.mesh_gateway = _as_bool_str(value['mesh_gateway'])
+    if 'mesh_supernode' in value:
+        ni.mesh_supernode = _as_bool_str(value['mesh_supernode'])
+
+
+def _parse_meshrf(ni: NodeInfo, value: Dict):
+    ni.meshRF = value.get('status', 'on')
+    ni.ssid = value.get('ssid', 'None')
+    ni.channel = str(value.get('channel', 'None'))
+    ni.chanbw = str(value.get('chanbw', 'None'))
+    ni.freq = str(value.get('freq', 'None'))
+
+    # Parse antenna info
+    ant = value.get('antenna')
+    if isinstance(ant, dict):
+        ni.antGain = float(ant.get('gain', 0))
+        ni.antBeam = float(ant.get('beamwidth', 0))
+        ni.antDesc = ant.get('description', 'Not Available')
+        ni.antBuiltin = str(ant.get('builtin', 'false'))
+
+
+def _parse_tunnels(ni: NodeInfo, value: Dict):
+    ni.tunnel_installed = str(value.get('tunnel_installed', 'false'))
+    ni.active_tunnel_count = str(value.get('active_tunnel_count', '0'))
+
+
+_WLAN_IFACES = frozenset({'wlan0', 'wlan1'})
+# Interfaces that carry the mesh address on nodes without a wlan radio
+_VLAN_IFACES = frozenset({'eth1.3975', 'eth0.3975', 'br-nomesh', 'br0'})
+
+
+def _parse_interfaces(ni: NodeInfo, value: List):
+    for iface in value:
+        if not isinstance(iface, dict):
+            continue
+        name = iface.get('name', '')
+        ip_addr = iface.get('ip', '')
+        has_ip = bool(ip_addr) and ip_addr != 'none'
+
+        if name in _WLAN_IFACES:
+            if 'mac' in iface:
+                ni.wifi_mac_address = iface['mac']
+            if has_ip:
+                ni.wlan_ip = ip_addr
+        elif name == 'br-lan':
+            if has_ip:
+                ni.lan_ip = ip_addr
+        elif name in _VLAN_IFACES:
+            if has_ip and ip_addr.startswith('10.'):
+                ni.wlan_ip = ip_addr
+
+
 class NodePoller:
-    """Handles individual node polling operations"""
+    """Handles individual node polling operations
+
+    The session must be a single long-lived aiohttp.ClientSession shared by
+    every poll, so pooled connections and cached DNS lookups are reused
+    across nodes rather than paying a new handshake per request.
+    """
     
     # Node timeout and retry settings
     NODE_TIMEOUT = 10  # seconds
+    NODE_CONNECT_TIMEOUT = 5  # seconds; unreachable nodes fail fast
+    CACHED_URL_TIMEOUT = 3  # seconds; a dead cached endpoint falls through quickly
     NODE_RETRY_DELAY = 5  # seconds
     MAX_RETRIES = 1
+
+    # The modern /a/sysinfo endpoint is tried first; only if it fails are the
+    # remaining port 8080 and legacy cgi-bin endpoints raced, first answer
+    # wins. link_info and local services come back in the same response, so
+    # one request covers the whole node.
+    _SYSINFO_TEMPLATES = (
+        "http://{ip}/a/sysinfo?link_info=1&services_local=1",
+        "http://{ip}:8080/a/sysinfo?link_info=1&services_local=1",
+        "http://{ip}/cgi-bin/sysinfo.json?link_info=1&services_local=1",
+        "http://{ip}:8080/cgi-bin/sysinfo.json?link_info=1&services_local=1",
+    )
     
     # Band identification constants
-    BAND_900_BOARD_IDS = ['0xe009', '0xe1b9', '0xe239']
-    BAND_2GHZ_CHANNELS = ['-1', '-2', '1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11']
-    BAND_3GHZ_CHANNELS = ['76', '77', '78', '79', '80', '81', '82', '83', '84', '85', '86', '87', '88', '89', '90', '91', '92', '93', '94', '95', '96', '97', '98', '99']
-    BAND_5GHZ_CHANNELS = ['37', '40', '44', '48', '52', '56', '60', '64', '100', '104', '108', '112', '116', '120', '124', '128', '132', '133', '134', '135', '136', '137', '138', '139', '140', '141', '142', '143', '144', '145', '146', '147', '148', '149', '150', '151', '152', '153', '154', '155', '156', '157', '158', '159', '160', '161', '162', '163', '164', '165', '166', '167', '168', '169', '170', '171', '172', '173', '174', '175', '176', '177', '178', '179', '180', '181', '182', '183', '184']
+    BAND_900_BOARD_IDS = frozenset({'0xe009', '0xe1b9', '0xe239'})
+    BAND_2GHZ_CHANNELS = frozenset({'-1', '-2', '1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11'})
+    BAND_3GHZ_CHANNELS = frozenset({'76', '77', '78', '79', '80', '81', '82', '83', '84', '85', '86', '87', '88', '89', '90', '91', '92', '93', '94', '95', '96', '97', '98', '99'})
+    BAND_5GHZ_CHANNELS = frozenset({'37', '40', '44', '48', '52', '56', '60', '64', '100', '104', '108', '112', '116', '120', '124', '128', '132', '133', '134', '135', '136', '137', '138', '139', '140', '141', '142', '143', '144', '145', '146', '147', '148', '149', '150', '151', '152', '153', '154', '155', '156', '157', '158', '159', '160', '161', '162', '163', '164', '165', '166', '167', '168', '169', '170', '171', '172', '173', '174', '175', '176', '177', '178', '179', '180', '181', '182', '183', '184'})
+    # Channel -> band, built once so _check_band is a single lookup
+    CHANNEL_TO_BAND = {
+        **dict.fromkeys(BAND_2GHZ_CHANNELS, '2GHz'),
+        **dict.fromkeys(BAND_3GHZ_CHANNELS, '3GHz'),
+        **dict.fromkeys(BAND_5GHZ_CHANNELS, '5GHz'),
+    }
     
+    # A timeout while connecting means the node is offline, not that the mesh
+    # is overloaded (aiohttp < 3.10 raises ServerTimeoutError for sock_connect)
+    _CONNECT_TIMEOUT_ERRORS = (getattr(aiohttp, 'ConnectionTimeoutError', aiohttp.ServerTimeoutError),)
+
     def __init__(self, session: aiohttp.ClientSession, logger: logging.Logger):
         self.session = session
         self.logger = logger
+        self._timeout = aiohttp.ClientTimeout(total=self.NODE_TIMEOUT, sock_connect=self.NODE_CONNECT_TIMEOUT)
+        self._cached_url_timeout = aiohttp.ClientTimeout(total=self.CACHED_URL_TIMEOUT)
+        # ip -> sysinfo URL that last returned data
+        self._url_cache: Dict[str, str] = {}
+        # Hosts whose last poll timed out after connecting or was dropped
+        # mid-request: signs of congestion rather than an offline node
+        self.congested_hosts: Set[str] = set()
         
-    @staticmethod
-    def check_band(channel: str, board_id: str = None) -> str:
-        """Determine frequency band from channel and board_id"""
-        if board_id and board_id in NodePoller.BAND_900_BOARD_IDS:
-            return '900MHz'
-        if channel in NodePoller.BAND_2GHZ_CHANNELS:
-            return '2GHz'
-        if channel in NodePoller.BAND_3GHZ_CHANNELS:
-            return '3GHz'
-        if channel in NodePoller.BAND_5GHZ_CHANNELS:
-            return '5GHz'
-        return 'Unknown'
-    
     async def fetch_json(self, url: str, retries: int = MAX_RETRIES) -> Optional[Dict]:
         """Fetch and parse JSON from URL with retries"""
+        data, _ = await self._fetch_json_from(url, retries)
+        return data
+
+    async def _fetch_json_from(self, url: str, retries: int = MAX_RETRIES,
+                               timeout: Optional[aiohttp.ClientTimeout] = None) -> Tuple[Optional[Dict], str]:
+        """Fetch and parse JSON from URL, also returning the URL that served it"""
         for attempt in range(retries + 1):
             try:
-                timeout = aiohttp.ClientTimeout(total=self.NODE_TIMEOUT)
                 # allow_redirects=True is important because many nodes 301/302 to the actual endpoint
-                async with self.session.get(url, timeout=timeout, allow_redirects=True) as response:
+                async with self.session.get(url, timeout=timeout or self._timeout, allow_redirects=True) as response:
                     if response.status == 200:
-                        text = await response.text()
-                        # Remove non-printable characters
-                        text = ''.join(char for char in text if char.isprintable() or char in '\n\r\t')
-                        return json.loads(text)
+                        raw = await response.read()
+                        # Remember where a redirect landed, as long as it kept our query
+                        final_url = str(response.url) if response.history and response.url.query_string else url
+                        try:
+                            return _json_loads(raw), final_url
+                        except ValueError:
+                            # Remove non-printable characters and try again
+                            return _json_loads(raw.translate(None, _SCRUB_DELETE)), final_url
                     else:
                         self.logger.debug(f"HTTP {response.status} from {url}")
-                        return None
-            except asyncio.TimeoutError:
+                        return None, url
+            except asyncio.TimeoutError as e:
+                # The short cached-URL probe says nothing about congestion
+                if timeout is None and not isinstance(e, self._CONNECT_TIMEOUT_ERRORS):
+                    self.congested_hosts.add(urlsplit(url).hostname)
                 if attempt < retries:
                     self.logger.debug(f"Timeout fetching {url}, retry {attempt + 1}/{retries}")
                     await asyncio.sleep(self.NODE_RETRY_DELAY)
                 else:
                     self.logger.debug(f"Final timeout on {url}")
-                    return None
+                    return None, url
+            except aiohttp.ServerDisconnectedError as e:
+                self.congested_hosts.add(urlsplit(url).hostname)
+                self.logger.debug(f"Disconnected fetching {url}: {e}")
+                return None, url
             except Exception as e:
                 self.logger.debug(f"Error fetching {url}: {e}")
-                return None
-        return None
+                return None, url
+        return None, url
+
+    async def fetch_first_json(self, urls: List[str]) -> Tuple[Optional[Dict], Optional[str]]:
+        """Fetch candidate URLs concurrently; return the first usable response and its URL"""
+        tasks = [asyncio.create_task(self._fetch_json_from(url)) for url in urls]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                data, final_url = await fut
+                if data:
+                    return data, final_url
+            return None, None
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
     
     async def poll_node(self, ip: str, hops: int = 0) -> Optional[NodeInfo]:
         """Poll a single node and return its information"""
         start_time = time.time()
         poll_time = datetime.now(timezone.utc)
         
-        # Prefer modern /a/sysinfo, but fall back to legacy cgi-bin for compatibility
-        sysinfo_candidates = [
-            f"http://{ip}/a/sysinfo",
-            f"http://{ip}:8080/a/sysinfo",
-            f"http://{ip}/cgi-bin/sysinfo.json",
-            f"http://{ip}:8080/cgi-bin/sysinfo.json",
-        ]
-
+        self.congested_hosts.discard(ip)
+        # Go straight to the endpoint that answered last time, with a short
+        # timeout; if it no longer works, forget it and search the candidates
         data = None
-        for url in sysinfo_candidates:
-            data = await self.fetch_json(url)
+        cached_url = self._url_cache.get(ip)
+        if cached_url:
+            data, _ = await self._fetch_json_from(cached_url, retries=0, timeout=self._cached_url_timeout)
+            if not data:
+                del self._url_cache[ip]
+        if not data:
+            primary, *fallbacks = [t.format(ip=ip) for t in self._SYSINFO_TEMPLATES]
+            data, final_url = await self._fetch_json_from(primary, retries=0)
+            if not data:
+                data, final_url = await self.fetch_first_json(fallbacks)
             if data:
-                break
+                self._url_cache[ip] = final_url
 
         if not data:
             self.logger.debug(f"Failed to poll node {ip}")
@@ -691,51 +1101,10 @@ class NodePoller:
         try:
             node_info = self._parse_sysinfo(data, ip)
             node_info.hopsAway = hops
-            node_info.band = self.check_band(node_info.channel, node_info.board_id)
+            node_info.band = _check_band(node_info.channel, node_info.board_id)
             node_info.response_time_ms = round((time.time() - start_time) * 1000, 2)
             node_info.last_seen = poll_time
             
-            # Fetch link_info separately for each node (modern first, legacy fallback)
-            link_candidates = [
-                f"http://{ip}/a/sysinfo?link_info=1",
-                f"http://{ip}:8080/a/sysinfo?link_info=1",
-                f"http://{ip}/cgi-bin/sysinfo.json?link_info=1",
-                f"http://{ip}:8080/cgi-bin/sysinfo.json?link_info=1",
-            ]
-            link_info_data = None
-            for url in link_candidates:
-                link_info_data = await self.fetch_json(url)
-                if link_info_data:
-                    break
-
-            if link_info_data and isinstance(link_info_data, dict):
-                link_info_dict = link_info_data.get('link_info')
-                if link_info_dict and isinstance(link_info_dict, dict):
-                    node_info.link_info = pickle.dumps(link_info_dict).hex()
-            
-            # Fetch services separately for each node (modern first, legacy fallback), local services only
-            services_candidates = [
-                f"http://{ip}/a/sysinfo?services_local=1",
-                f"http://{ip}:8080/a/sysinfo?services_local=1",
-                f"http://{ip}/cgi-bin/sysinfo.json?services_local=1",
-                f"http://{ip}:8080/cgi-bin/sysinfo.json?services_local=1",
-            ]
-            services_data = None
-            for url in services_candidates:
-                services_data = await self.fetch_json(url)
-                if services_data:
-                    break
-
-            if services_data and isinstance(services_data, dict):
-                services_list = services_data.get('services_local') or services_data.get('services')
-                if services_list is None:
-                    services_list = []
-                if isinstance(services_list, list):
-                    # Always store the list (even if empty) so UI shows "No Published Services" correctly
-                    node_info.services = pickle.dumps(services_list).hex()
-                    if len(services_list) > 0:
-                        self.logger.debug(f"Found {len(services_list)} services for node {ip}")
-            
             return node_info
         except Exception as e:
             self.logger.error(f"Error parsing data from {ip}: {e}")
@@ -746,117 +1115,135 @@ class NodePoller:
         node_info = NodeInfo()
         node_info.wlan_ip = ip
         
-        # Parse root-level fields
-        for key, value in data.items():
-            if key == 'node':
-                node_info.node = value
-            elif key == 'lat':
-                node_info.lat = float(value) if value else 0.0
-            elif key == 'lon':
-                node_info.lon = float(value) if value else 0.0
-            elif key == 'api_version':
-                node_info.api_version = value
-            elif key == 'grid_square':
-                node_info.grid_square = value
-            elif key == 'model':
-                node_info.model = value
-            elif key == 'board_id':
-                node_info.board_id = value
-            elif key == 'firmware_version':
-                node_info.firmware_version = value
-            elif key == 'firmware_mfg':
-                node_info.firmware_mfg = value
-            elif key == 'uptime':
-                node_info.uptime = str(value)
-            elif key == 'description':
-                node_info.description = value
-            
-            # Parse sysinfo (nested object with uptime and loads)
-            elif key == 'sysinfo' and isinstance(value, dict):
-                if 'uptime' in value:
-                    node_info.uptime = str(value['uptime'])
-                if 'loads' in value and isinstance(value['loads'], list):
-                    node_info.loadavg = pickle.dumps(value['loads']).hex()
-            
-            # Parse node_details (older API format)
-            elif key == 'node_details' and isinstance(value, dict):
-                if 'model' in value:
-                    node_info.model = value['model']
-                if 'board_id' in value:
-                    node_info.board_id = value['board_id']
-                if 'firmware_version' in value:
-                    node_info.firmware_version = value['firmware_version']
-                if 'firmware_mfg' in value:
-                    node_info.firmware_mfg = value['firmware_mfg']
-                if 'description' in value:
-                    node_info.description = value['description']
-                if 'mesh_gateway' in value:
-                    node_info.mesh_gateway = 'true' if value['mesh_gateway'] in [1, '1', True, 'true'] else 'false'
-                if 'mesh_supernode' in value:
-                    node_info.mesh_supernode = 'true' if value['mesh_supernode'] in [1, '1', True, 'true'] else 'false'
-            
-            # Parse nested structures
-            elif key == 'meshrf' and isinstance(value, dict):
-                node_info.meshRF = value.get('status', 'on')
-                node_info.ssid = value.get('ssid', 'None')
-                node_info.channel = str(value.get('channel', 'None'))
-                node_info.chanbw = str(value.get('chanbw', 'None'))
-                node_info.freq = str(value.get('freq', 'None'))
-                
-                # Parse antenna info
-                if 'antenna' in value and isinstance(value['antenna'], dict):
-                    ant = value['antenna']
-                    node_info.antGain = float(ant.get('gain', 0))
-                    node_info.antBeam = float(ant.get('beamwidth', 0))
-                    node_info.antDesc = ant.get('description', 'Not Available')
-                    node_info.antBuiltin = str(ant.get('builtin', 'false'))
-            
-            elif key == 'tunnels' and isinstance(value, dict):
-                node_info.tunnel_installed = str(value.get('tunnel_installed', 'false'))
-                node_info.active_tunnel_count = str(value.get('active_tunnel_count', '0'))
-            
-            elif key == 'interfaces' and isinstance(value, list):
-                for iface in value:
-                    if not isinstance(iface, dict):
-                        continue
-                    name = iface.get('name', '')
-                    ip_addr = iface.get('ip', '')
-                    
-                    if name == 'wlan0' or name == 'wlan1':
-                        if 'mac' in iface:
-                            node_info.wifi_mac_address = iface['mac']
-                        if ip_addr and ip_addr != 'none':
-                            node_info.wlan_ip = ip_addr
-                    elif name == 'br-lan' and ip_addr and ip_addr != 'none':
-                        node_info.lan_ip = ip_addr
-                    elif name in ['eth1.3975', 'eth0.3975', 'br-nomesh', 'br0']:
-                        if ip_addr and ip_addr != 'none' and ip_addr.startswith('10.'):
-                            node_info.wlan_ip = ip_addr
-            
-            elif key == 'services_local' and isinstance(value, list):
-                node_info.services = pickle.dumps(value).hex()
-            
-            elif key == 'link_info' and isinstance(value, dict):
-                node_info.link_info = pickle.dumps(value).hex()
-            
-            elif key == 'loads' and isinstance(value, list):
-                node_info.loadavg = pickle.dumps(value).hex()
-            
-            # Gateway and supernode flags
-            elif key == 'mesh_gateway':
-                node_info.mesh_gateway = 'true' if value in [1, '1', True, 'true'] else 'false'
-            elif key == 'mesh_supernode':
-                node_info.mesh_supernode = 'true' if value in [1, '1', True, 'true'] else 'false'
+        g = data.get
+        
+        # Root-level fields (older firmware reports model and friends here)
+        if (v := g('node')) is not None:
+            node_info.node = v
+        if (v := g('lat')) is not None:
+            node_info.lat = float(v) if v else 0.0
+        if (v := g('lon')) is not None:
+            node_info.lon = float(v) if v else 0.0
+        if (v := g('api_version')) is not None:
+            node_info.api_version = v
+        if (v := g('grid_square')) is not None:
+            node_info.grid_square = v
+        if (v := g('model')) is not None:
+            node_info.model = v
+        if (v := g('board_id')) is not None:
+            node_info.board_id = v
+        if (v := g('firmware_version')) is not None:
+            node_info.firmware_version = v
+        if (v := g('firmware_mfg')) is not None:
+            node_info.firmware_mfg = v
+        if (v := g('uptime')) is not None:
+            node_info.uptime = str(v)
+        if (v := g('description')) is not None:
+            node_info.description = v
+        if isinstance(v := g('loads'), list):
+            node_info.loadavg = _dump_stored(v)
+        if (v := g('mesh_gateway')) is not None:
+            node_info.mesh_gateway = _as_bool_str(v)
+        if (v := g('mesh_supernode')) is not None:
+            node_info.mesh_supernode = _as_bool_str(v)
+        
+        # Nested sections; these override the root-level values above
+        if isinstance(v := g('sysinfo'), dict):
+            _parse_sysinfo_block(node_info, v)
+        if isinstance(v := g('node_details'), dict):
+            _parse_node_details(node_info, v)
+        if isinstance(v := g('meshrf'), dict):
+            _parse_meshrf(node_info, v)
+        if isinstance(v := g('tunnels'), dict):
+            _parse_tunnels(node_info, v)
+        if isinstance(v := g('interfaces'), list):
+            _parse_interfaces(node_info, v)
+        
+        # An empty dict leaves link_info unset so the topology value is kept
+        if isinstance(v := g('link_info'), dict) and v:
+            node_info.link_info = _dump_stored(v)
+        
+        # Local services only; fall back to the full list on firmware that
+        # ignores services_local
+        services_list = data.get('services_local') or data.get('services')
+        if services_list is None:
+            services_list = []
+        if isinstance(services_list, list):
+            # Always store the list (even if empty) so UI shows "No Published Services" correctly
+            node_info.services = _dump_stored(services_list)
+            if len(services_list) > 0:
+                self.logger.debug(f"Found {len(services_list)} services for node {ip}")
         
         return node_info
 
 
+@lru_cache(maxsize=1024)
+def _check_band(channel: str, board_id: str = None) -> str:
+    """Determine frequency band from channel and board_id"""
+    if board_id and board_id in NodePoller.BAND_900_BOARD_IDS:
+        return '900MHz'
+    return NodePoller.CHANNEL_TO_BAND.get(channel, 'Unknown')
+
+
+# Map data bucket by channel number: 2.4GHz 0-11, 5GHz 37-64 and 100-184,
+# 3GHz 76-99; channels 3000+ are 6GHz and shown with 5GHz
+_CHANNEL_BUCKETS: Tuple[Optional[str], ...] = tuple(
+    '2ghz' if ch <= 11 else
+    '5ghz' if 37 <= ch <= 64 or 100 <= ch <= 184 else
+    '3ghz' if 76 <= ch <= 99 else
+    None
+    for ch in range(185)
+)
+
+
+def _channel_bucket(channel: Any) -> Optional[str]:
+    """Return the all_devices bucket for a channel, or None if it has none"""
+    if isinstance(channel, str):
+        if not channel.isdigit():
+            return None
+        ch = int(channel)
+    elif isinstance(channel, int):
+        ch = channel
+        if ch < 0:
+            return '2ghz'
+    else:
+        return None
+    if ch < len(_CHANNEL_BUCKETS):
+        return _CHANNEL_BUCKETS[ch]
+    return '5ghz' if ch >= 3000 else None
+
+
 # ============================================================================
 # Main Polling Coordinator
 # ============================================================================
 
 class MeshPollingDaemon:
     """Main daemon class coordinating all polling operations"""
+
+    # Number of polled nodes written to the database per batch
+    NODE_WRITE_BATCH_SIZE = 200
+
+    # Batches written at once; stays well under the pool's maxsize so
+    # concurrent reads are not starved of connections
+    NODE_WRITE_CONCURRENCY = 4
+
+    # Default concurrent polls on the first cycle, to get initial data quickly.
+    # Kept moderate: mesh radios hang when flooded with parallel requests.
+    FIRST_CYCLE_PARALLEL_THREADS = 150
+
+    # Adaptive (AIMD) first-cycle concurrency: begin at ADAPTIVE_START_THREADS,
+    # and after every ADAPTIVE_WINDOW completed polls add ADAPTIVE_STEP while
+    # the window's congestion rate is below ADAPTIVE_LOW_ERROR_RATE, or scale
+    # the limit by ADAPTIVE_BACKOFF (never below the start) when it exceeds
+    # ADAPTIVE_HIGH_ERROR_RATE. Only timeouts after connecting and dropped
+    # connections count as congestion; offline nodes do not.
+    # These are defaults for the matching [polling] settings.
+    ADAPTIVE_START_THREADS = 32
+    ADAPTIVE_STEP = 10
+    ADAPTIVE_WINDOW = 20
+    ADAPTIVE_LOW_ERROR_RATE = 0.05
+    ADAPTIVE_HIGH_ERROR_RATE = 0.2
+    ADAPTIVE_BACKOFF = 0.5
     
     def __init__(self, config: ConfigManager, once: bool = False):
         self.config = config
@@ -873,12 +1260,37 @@ class MeshPollingDaemon:
         # Polling configuration
         self.nodelistNode = self.config.get('polling', 'nodelistNode', 'localnode.local.mesh')
         self.parallel_threads = self.config.getint('polling', 'numParallelThreads', 60)
+        self.first_cycle_parallel_threads = self.config.getint(
+            'polling', 'firstCycleParallelThreads', self.FIRST_CYCLE_PARALLEL_THREADS
+        )
+        self.adaptive_concurrency = self.config.get('polling', 'adaptiveConcurrency', True)
+        self.adaptive_start_threads = max(
+            self.config.getint('polling', 'adaptiveStartThreads', self.ADAPTIVE_START_THREADS), 1
+        )
+        self.adaptive_step = max(self.config.getint('polling', 'adaptiveStep', self.ADAPTIVE_STEP), 1)
+        self.adaptive_window = max(self.config.getint('polling', 'adaptiveWindow', self.ADAPTIVE_WINDOW), 1)
+        self.adaptive_low_error_rate = self.config.getfloat(
+            'polling', 'adaptiveLowErrorRate', self.ADAPTIVE_LOW_ERROR_RATE
+        )
+        self.adaptive_high_error_rate = self.config.getfloat(
+            'polling', 'adaptiveHighErrorRate', self.ADAPTIVE_HIGH_ERROR_RATE
+        )
+        self.adaptive_backoff = self.config.getfloat('polling', 'adaptiveBackoff', self.ADAPTIVE_BACKOFF)
         self.hops_parallel_threads = self.config.getint('hops', 'parallelThreads', 800)
         self.poller_cycle_minutes = self.config.getint('polling', 'pollerCycleTime', 30)
         self.poller_cycle_seconds = max(self.poller_cycle_minutes * 60, 1)
+        self.localnode = self.config.get('polling', 'localnode', 'localnode.local.mesh')
         self.localnode_ip: Optional[str] = None
         self.initial_link_map: Dict[str, Dict] = {}
         
+        # Output and retention configuration, read once rather than every cycle
+        self.json_dir = Path(self.config.get('json', 'jsonDir', 'data'))
+        self.map_tile_servers, self.default_tile_server = self._load_tile_servers()
+        self.map_info_template = self._load_map_info()
+        self.expire_old_nodes = self.config.get('retention', 'expireOldNodes', True)
+        self.expire_interval_days = self.config.getint('retention', 'expireInterval', 30)
+        self.expire_hops_days = self.config.getint('retention', 'expireHops', 30)
+        
         # Statistics
         self.stats = {
             'numParallelThreads': self.parallel_threads,
@@ -1021,9 +1433,26 @@ class MeshPollingDaemon:
             # Connect to database
             await self.db.connect()
             
-            # Create HTTP session with connection pooling
-            connector = aiohttp.TCPConnector(limit=self.parallel_threads, limit_per_host=10)
-            self.session = aiohttp.ClientSession(connector=connector)
+            # Create one long-lived HTTP session with connection pooling. Keep the
+            # per-host limit low: mesh radios hang under many parallel sockets.
+            # The total limit matches the largest poll semaphore: a node normally
+            # holds one socket, and only nodes whose /a/sysinfo failed open up to
+            # three while their fallback endpoints race, so briefly queueing those
+            # behind the limit is acceptable.
+            connector = aiohttp.TCPConnector(
+                limit=max(self.parallel_threads, self.first_cycle_parallel_threads),
+                limit_per_host=4,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+                enable_cleanup_closed=True
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(
+                    total=NodePoller.NODE_TIMEOUT,
+                    sock_connect=NodePoller.NODE_CONNECT_TIMEOUT
+                )
+            )
             self.node_poller = NodePoller(self.session, self.logger)
             
             self.running = True
@@ -1080,8 +1509,14 @@ class MeshPollingDaemon:
         # Step 4: Poll all nodes in parallel with rate limiting
         # Use high concurrency for first cycle to get initial data quickly
         if self.cycle_count == 1:
-            self.parallel_threads = 600
-            self.logger.info(f"Polling {len(node_devices)} nodes at maximum speed ({self.parallel_threads} concurrent)...")
+            self.parallel_threads = self.first_cycle_parallel_threads
+            if self.adaptive_concurrency:
+                self.logger.info(
+                    f"Polling {len(node_devices)} nodes at maximum speed (adaptive, "
+                    f"{min(self.adaptive_start_threads, self.parallel_threads)} to {self.parallel_threads} concurrent)..."
+                )
+            else:
+                self.logger.info(f"Polling {len(node_devices)} nodes at maximum speed ({self.parallel_threads} concurrent)...")
         else:
             self.parallel_threads = self.base_parallel_threads
             self.logger.info(
@@ -1095,32 +1530,30 @@ class MeshPollingDaemon:
         
         # Step 7: Build link topology with distances
         self.logger.info("Building link topology...")
-        await self._build_link_topology()
+        all_nodes = await self._build_link_topology()
         
         # Step 8: Save statistics
         elapsed = time.time() - start_time
         self.stats['pollingTimeSec'] = round(elapsed, 2)
         
-        # Step 9: Generate data files (also updates protocol counts in stats)
-        await self._generate_data_files()
+        # Step 9: Generate data files (also updates protocol counts in stats),
+        # reusing the node snapshot the link topology pass just wrote back
+        await self._generate_data_files(all_nodes)
 
         # Step 10: Save statistics after protocol counts are populated
         await self.db.save_polling_stats(self.stats)
         
         # Step 11: Expire old data based on retention policy
         # Expire old hop sequences
-        expire_hops_days = self.config.getint('retention', 'expireHops', 30)
         try:
-            await self.db.expire_old_hop_sequences(expire_hops_days)
+            await self.db.expire_old_hop_sequences(self.expire_hops_days)
         except Exception as e:
             self.logger.warning(f"Failed to expire old hop sequences: {e}")
         
         # Expire old nodes if enabled
-        expire_nodes_enabled = self.config.get('retention', 'expireOldNodes', True)
-        expire_nodes_days = self.config.getint('retention', 'expireInterval', 30)
-        if expire_nodes_enabled and expire_nodes_days > 0:
+        if self.expire_old_nodes and self.expire_interval_days > 0:
             try:
-                await self.db.expire_old_nodes(expire_nodes_days)
+                await self.db.expire_old_nodes(self.expire_interval_days)
             except Exception as e:
                 self.logger.warning(f"Failed to expire old nodes: {e}")
         
@@ -1133,9 +1566,16 @@ class MeshPollingDaemon:
         lqm_url = f"http://{self.nodelistNode}/cgi-bin/sysinfo.json?lqm=1"
         link_info_url = f"http://{self.nodelistNode}/cgi-bin/sysinfo.json?link_info=1"
 
-        nodes_payload = await self.node_poller.fetch_json(nodes_url)
-        lqm_payload = await self.node_poller.fetch_json(lqm_url)
-        link_info_payload = await self.node_poller.fetch_json(link_info_url)
+        # Independent requests to the same node; the connector allows 4 per host
+        payloads = await asyncio.gather(
+            self.node_poller.fetch_json(nodes_url),
+            self.node_poller.fetch_json(lqm_url),
+            self.node_poller.fetch_json(link_info_url),
+            return_exceptions=True
+        )
+        nodes_payload, lqm_payload, link_info_payload = (
+            None if isinstance(p, Exception) else p for p in payloads
+        )
 
         # Extract nodes list
         nodes_list: List[Dict] = []
@@ -1184,9 +1624,9 @@ class MeshPollingDaemon:
 
                 link_type = tracker.get('type') or ''
                 lt_lower = link_type.lower()
-                if lt_lower in ['wireguard', 'tunnel', 'tun']:
+                if lt_lower in {'wireguard', 'tunnel', 'tun'}:
                     link_type_out = 'TUN'
-                elif lt_lower in ['dtd', 'dtdlink']:
+                elif lt_lower in {'dtd', 'dtdlink'}:
                     link_type_out = 'DTD'
                 elif lt_lower == 'rf':
                     link_type_out = 'RF'
@@ -1446,25 +1886,60 @@ class MeshPollingDaemon:
         """Update database with initial topology information"""
         # Optionally enhance hopsAway using hop measurement before persisting
         await self._maybe_update_hops(node_devices)
-        for ip, info in node_devices.items():
-            # Only insert pollable nodes (those with valid hopsAway)
-            # Synthesized nodes (hopsAway=None) will be created from link data enrichment later
-            if info['hopsAway'] is None:
-                continue
-            node_data = NodeInfo(
+        # Only insert pollable nodes (those with valid hopsAway)
+        # Synthesized nodes (hopsAway=None) will be created from link data enrichment later
+        nodes_batch = [
+            NodeInfo(
                 wlan_ip=ip,
                 hopsAway=info['hopsAway'],
-                link_info=pickle.dumps(info['link_info']).hex()
+                link_info=_dump_stored(info['link_info'])
             )
-            try:
-                await self.db.upsert_node(node_data)
-            except Exception as e:
-                self.logger.error(f"Error updating topology for {ip}: {e}")
+            for ip, info in node_devices.items()
+            if info['hopsAway'] is not None
+        ]
+        await self._write_in_batches(self._flush_node_writes, nodes_batch, key=attrgetter('wlan_ip'))
+    
+    async def _write_in_batches(self, writer, items: List[Any], key):
+        """Split items into NODE_WRITE_BATCH_SIZE chunks and write them concurrently
+
+        Items are sorted by their primary key first so concurrent chunks lock
+        disjoint, ordered key ranges instead of deadlocking on each other.
+        writer returns the number of rows it could not write.
+        """
+        if not items:
+            return
+        items = sorted(items, key=key)
+        size = self.NODE_WRITE_BATCH_SIZE
+        chunks = [items[start:start + size] for start in range(0, len(items), size)]
+        sem = asyncio.Semaphore(self.NODE_WRITE_CONCURRENCY)
+
+        async def write_chunk(chunk: List[Any]):
+            async with sem:
+                return await writer(chunk)
+
+        results = await asyncio.gather(*(write_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        for number, (chunk, result) in enumerate(zip(chunks, results), 1):
+            if isinstance(result, BaseException):
+                self.logger.error(f"Write batch {number}/{len(chunks)} of {len(chunk)} rows failed: {result}")
+            else:
+                self.logger.debug(f"Write batch {number}/{len(chunks)}: {len(chunk) - (result or 0)} of {len(chunk)} rows written")
     
     async def _poll_all_nodes(self, node_devices: Dict) -> List[NodeInfo]:
         """Poll all nodes with rate limiting; responsive to shutdown"""
-        semaphore = asyncio.Semaphore(self.parallel_threads)
-        tasks: List[asyncio.Task] = []
+        # The first cycle is unthrottled, so its concurrency adapts to the
+        # congestion rate up to parallel_threads; later cycles use a fixed limit
+        adaptive = self.adaptive_concurrency and self.cycle_count == 1
+        max_limit = max(self.parallel_threads, 1)
+        min_limit = min(self.adaptive_start_threads, max_limit)
+        limit = min_limit if adaptive else max_limit
+        semaphore = asyncio.Semaphore(limit)
+        shrink_debt = 0  # permits to retire as polls finish, after a decrease
+        window_polls = 0
+        window_errors = 0
+        # Polls launched before the last decrease ran at the old limit, so
+        # their outcomes are not counted toward the next decision
+        settled_from = 0
+        tasks: Set[asyncio.Task] = set()  # polls in flight
         
         # Calculate delay between task creation for cycles after the first
         total_nodes = len(node_devices)
@@ -1478,78 +1953,151 @@ class MeshPollingDaemon:
         else:
             inter_poll_delay = 0.0
 
-        async def rate_limited_poll(ip: str, hops: int, delay: float):
-            if self.shutdown_event.is_set():
-                return None
-            # Skip synthesized nodes (hops=None means discovered via links only, not directly reachable)
-            if hops is None:
-                self.logger.debug(f"Skipping synthesized node {ip} (not directly reachable)")
-                return None
-            # Add startup delay for rate limiting (after first cycle)
-            if delay > 0:
-                await asyncio.sleep(delay)
-            async with semaphore:
-                if self.shutdown_event.is_set():
-                    return None
-                return await self.node_poller.poll_node(ip, hops)
+        # Completed polls arrive here as (result, error, launch index, congested)
+        results_queue: asyncio.Queue = asyncio.Queue()
+        producer_done = object()
+        launched = 0
 
-        # Create tasks for all nodes with staggered delays
-        for idx, (ip, info) in enumerate(node_devices.items()):
-            # Skip synthesized nodes - they're discovered via link data but not directly reachable
-            if info['hopsAway'] is None:
-                continue
-            delay = inter_poll_delay * idx if self.cycle_count > 1 else 0.0
-            tasks.append(asyncio.create_task(rate_limited_poll(ip, info['hopsAway'], delay)))
+        async def poll_then_release(ip: str, hops: int, seq: int):
+            nonlocal shrink_debt
+            try:
+                result = await self.node_poller.poll_node(ip, hops)
+                results_queue.put_nowait((result, None, seq, ip in self.node_poller.congested_hosts))
+            except Exception as e:
+                results_queue.put_nowait((None, e, seq, False))
+            finally:
+                if shrink_debt:
+                    shrink_debt -= 1
+                else:
+                    semaphore.release()
+
+        def adapt_limit(seq: int, congested: bool):
+            """Additive increase / multiplicative decrease of the poll limit"""
+            nonlocal limit, shrink_debt, window_polls, window_errors, settled_from
+            if seq < settled_from:
+                return
+            window_polls += 1
+            window_errors += congested
+            if window_polls < self.adaptive_window:
+                return
+            error_rate = window_errors / window_polls
+            window_polls = 0
+            window_errors = 0
+            if error_rate > self.adaptive_high_error_rate and limit > min_limit:
+                # Always shed at least one permit, whatever the backoff factor
+                new_limit = max(min(int(limit * self.adaptive_backoff), limit - 1), min_limit)
+                shrink_debt += limit - new_limit
+                settled_from = launched
+            elif error_rate < self.adaptive_low_error_rate and limit < max_limit:
+                new_limit = min(limit + self.adaptive_step, max_limit)
+                grow = new_limit - limit
+                # Cancel pending decreases before handing out new permits
+                cancelled = min(shrink_debt, grow)
+                shrink_debt -= cancelled
+                for _ in range(grow - cancelled):
+                    semaphore.release()
+            else:
+                return
+            self.logger.debug(
+                f"Adaptive polling: congestion rate {error_rate:.0%}, concurrency {limit} -> {new_limit}"
+            )
+            limit = new_limit
+
+        async def produce():
+            """Launch polls on schedule, never more than parallel_threads at once"""
+            nonlocal launched
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            try:
+                for idx, (ip, info) in enumerate(node_devices.items()):
+                    # Skip synthesized nodes - they're discovered via link data but not directly reachable
+                    if info['hopsAway'] is None:
+                        continue
+                    # Staggered start for rate limiting (after first cycle); wake early on shutdown
+                    wait = start + inter_poll_delay * idx - loop.time()
+                    if wait > 0:
+                        try:
+                            await asyncio.wait_for(self.shutdown_event.wait(), timeout=wait)
+                        except asyncio.TimeoutError:
+                            pass
+                    await semaphore.acquire()
+                    if self.shutdown_event.is_set():
+                        semaphore.release()
+                        break
+                    task = asyncio.create_task(poll_then_release(ip, info['hopsAway'], launched))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                    launched += 1
+            finally:
+                results_queue.put_nowait(producer_done)
 
         results: List[NodeInfo] = []
+        pending_writes: List[NodeInfo] = []
         completed = 0
-        total = len(tasks)
+        total = sum(1 for info in node_devices.values() if info['hopsAway'] is not None)
         last_reported_percent = 0
 
-        pending = set(tasks)
+        producer = asyncio.create_task(produce())
+        producing = True
+        received = 0
         try:
-            while pending and not self.shutdown_event.is_set():
-                done, pending = await asyncio.wait(
-                    pending,
-                    return_when=asyncio.FIRST_COMPLETED
-                )
-                for t in done:
-                    if t.cancelled():
-                        continue
-                    try:
-                        result = t.result()
-                    except Exception as e:
-                        self.logger.debug(f"Polling task error: {e}")
-                        self.stats['nodesWithErrors'] += 1
-                        continue
-
-                    completed += 1
-                    current_percent = int((completed / total) * 100)
-                    # Report at 10% intervals
-                    if current_percent >= last_reported_percent + 10 or completed == total:
-                        # Round down to nearest 10%
-                        report_percent = (current_percent // 10) * 10
-                        if report_percent > last_reported_percent or completed == total:
-                            self.logger.info(f"Polling progress: {current_percent}% ({completed}/{total})")
-                            last_reported_percent = report_percent
+            while producing or received < launched:
+                item = await results_queue.get()
+                if item is producer_done:
+                    producing = False
+                    continue
+                if self.shutdown_event.is_set():
+                    break
+                received += 1
+                result, error, seq, congested = item
+                if adaptive:
+                    adapt_limit(seq, congested)
+                if error is not None:
+                    self.logger.debug(f"Polling task error: {error}")
+                    self.stats['nodesWithErrors'] += 1
+                    continue
 
-                    if result:
-                        results.append(result)
-                        try:
-                            await self.db.upsert_node(result)
-                        except Exception as e:
-                            self.logger.error(f"Error saving node {result.wlan_ip}: {e}")
-                    else:
-                        self.stats['nodesWithErrors'] += 1
+                completed += 1
+                current_percent = int((completed / total) * 100)
+                # Report at 10% intervals
+                if current_percent >= last_reported_percent + 10 or completed == total:
+                    # Round down to nearest 10%
+                    report_percent = (current_percent // 10) * 10
+                    if report_percent > last_reported_percent or completed == total:
+                        self.logger.info(f"Polling progress: {current_percent}% ({completed}/{total})")
+                        last_reported_percent = report_percent
+
+                if result:
+                    results.append(result)
+                    pending_writes.append(result)
+                    if len(pending_writes) >= self.NODE_WRITE_BATCH_SIZE:
+                        await self._flush_node_writes(pending_writes)
+                        pending_writes = []
+                else:
+                    self.stats['nodesWithErrors'] += 1
+            await self._flush_node_writes(pending_writes)
+            if adaptive:
+                self.logger.info(f"Adaptive polling finished at {limit} concurrent (max {max_limit})")
         finally:
-            # Cancel any remaining tasks on shutdown
-            for t in pending:
-                if not t.done():
-                    t.cancel()
-            await asyncio.gather(*tasks, return_exceptions=True)
+            # Stop launching and cancel any polls still running on shutdown
+            producer.cancel()
+            in_flight = list(tasks)
+            for t in in_flight:
+                t.cancel()
+            await asyncio.gather(producer, *in_flight, return_exceptions=True)
 
         return results
     
+    async def _flush_node_writes(self, nodes: List[NodeInfo]) -> int:
+        """Write a batch of polled nodes to the database; returns the rows not written"""
+        if not nodes:
+            return 0
+        try:
+            return await self.db.upsert_nodes_batch(nodes)
+        except Exception as e:
+            self.logger.error(f"Error saving {len(nodes)} nodes: {e}")
+            return len(nodes)
+
     def _calculate_stats(self, nodes: List[NodeInfo], node_devices: Dict[str, Dict] = None):
         """Calculate polling statistics"""
         self.stats['totalPolled'] = len(nodes)
@@ -1564,35 +2112,62 @@ class MeshPollingDaemon:
         else:
             self.stats['garbageReturned'] = self.stats['nodeTotal'] - len(nodes)
         
-        no_location = sum(1 for n in nodes if n.lat == 0.0 or n.lon == 0.0)
-        no_location_nodes = [n.node for n in nodes if n.lat == 0.0 or n.lon == 0.0]
+        # One pass for missing locations and JSON fetch time range; names are
+        # only collected when they will actually be logged
+        log_no_location = self.logger.isEnabledFor(logging.INFO)
+        no_location = 0
+        no_location_nodes = []
+        min_response = None
+        max_response = None
+        for n in nodes:
+            if n.lat == 0.0 or n.lon == 0.0:
+                no_location += 1
+                if log_no_location:
+                    no_location_nodes.append(n.node)
+            response_time = n.response_time_ms
+            if response_time > 0:
+                if min_response is None or response_time < min_response:
+                    min_response = response_time
+                if max_response is None or response_time > max_response:
+                    max_response = response_time
+        
         if no_location_nodes:
             self.logger.info(f"Nodes with no location (lat/lon = 0): {no_location_nodes}")
         self.stats['noLocation'] = no_location
         self.stats['mappableNodes'] = len(nodes) - no_location
         
         # Calculate JSON fetch time statistics
-        if nodes:
-            response_times = [n.response_time_ms for n in nodes if n.response_time_ms > 0]
-            if response_times:
-                self.stats['minJsonFetchTimeMs'] = round(min(response_times), 2)
-                self.stats['maxJsonFetchTimeMs'] = round(max(response_times), 2)
+        if min_response is not None:
+            self.stats['minJsonFetchTimeMs'] = round(min_response, 2)
+            self.stats['maxJsonFetchTimeMs'] = round(max_response, 2)
     
-    async def _build_link_topology(self):
-        """Build complete link topology with distance/bearing calculations"""
+    async def _build_link_topology(self) -> Optional[List[Dict]]:
+        """Build complete link topology with distance/bearing calculations
+
+        Returns the node rows with their link_info brought up to date (as a
+        dict for enriched nodes), so the data file pass can reuse them, or
+        None if the topology build failed.
+        """
         try:
             all_nodes = await self.db.get_all_nodes()
             link_count = 0
+            enriched: List[Tuple[Dict, Dict]] = []
+            # RF links awaiting distance/bearing, with their endpoint coordinates
+            rf_links: List[Dict] = []
+            rf_coords: List[Tuple[float, float, float, float]] = []
+            
+            # Destination coordinates by IP, parsed once for every link lookup
+            coord_by_ip = {
+                n['wlan_ip']: (float(n.get('lat', 0) or 0), float(n.get('lon', 0) or 0))
+                for n in all_nodes if n.get('wlan_ip')
+            }
             
             for node in all_nodes:
                 links = None
 
                 # Prefer stored link_info; fallback to initial LQM map for localnode
                 if node.get('link_info'):
-                    try:
-                        links = pickle.loads(bytes.fromhex(node['link_info']))
-                    except Exception:
-                        links = None
+                    links = _load_stored(node['link_info'])
                 elif self.localnode_ip and node.get('wlan_ip') == self.localnode_ip:
                     links = self.initial_link_map.get(self.localnode_ip, {})
 
@@ -1608,21 +2183,12 @@ class MeshPollingDaemon:
                 # Enrich each link with coordinates and distance
                 for dest_ip, link_data in links.items():
                     # Find destination node coordinates
-                    dest_node = next((n for n in all_nodes if n.get('wlan_ip') == dest_ip), None)
-                    dest_lat = 0.0
-                    dest_lon = 0.0
-
-                    if dest_node:
-                        dest_lat = float(dest_node.get('lat', 0) or 0)
-                        dest_lon = float(dest_node.get('lon', 0) or 0)
+                    dest_lat, dest_lon = coord_by_ip.get(dest_ip, (0.0, 0.0))
 
                     # Fallback to link-provided coordinates (from LQM tracker)
                     if (not dest_lat or not dest_lon) and link_data.get('lat') and link_data.get('lon'):
                         dest_lat = float(link_data.get('lat'))
                         dest_lon = float(link_data.get('lon'))
-                        # If we had no DB node for this IP, synthesize one to enrich later lookups
-                        if not dest_node:
-                            dest_node = {'wlan_ip': dest_ip, 'lat': dest_lat, 'lon': dest_lon}
 
                     if dest_lat == 0 or dest_lon == 0:
                         continue
@@ -1630,23 +2196,38 @@ class MeshPollingDaemon:
                     link_data['linkLat'] = dest_lat
                     link_data['linkLon'] = dest_lon
                     
-                    # Calculate distance and bearing for RF links
+                    # Distance and bearing for RF links are computed in one pass below
                     if link_data.get('linkType') == 'RF':
-                        dist_bear = self._calculate_distance_bearing(
-                            node_lat, node_lon, dest_lat, dest_lon
-                        )
-                        link_data.update(dist_bear)
+                        rf_links.append(link_data)
+                        rf_coords.append((node_lat, node_lon, dest_lat, dest_lon))
                     
                     link_count += 1
                 
-                # Update database with enriched links
-                await self.db.update_link_info(node['wlan_ip'], links)
+                # Queue enriched links for the batched database update
+                enriched.append((node, links))
+            
+            for link_data, dist_bear in zip(rf_links, self._calculate_distance_bearing_many(rf_coords)):
+                link_data.update(dist_bear)
+            
+            link_updates: List[Tuple[str, str]] = []
+            for node, links in enriched:
+                link_str = _dump_stored(links)
+                # Skip rows whose links enrichment left untouched (no destination
+                # had coordinates): the stored JSON is already identical
+                if link_str != node.get('link_info'):
+                    link_updates.append((node['wlan_ip'], link_str))
+                # Keep the decoded links on the row so the data file pass
+                # does not decode them again
+                node['link_info'] = links
+            await self._write_in_batches(self.db.update_link_info_batch, link_updates, key=itemgetter(0))
             
             self.stats['mappableLinks'] = link_count
             self.logger.info(f"Built {link_count} mappable links")
+            return all_nodes
             
         except Exception as e:
             self.logger.error(f"Error building link topology: {e}", exc_info=True)
+            return None
     
     @staticmethod
     def _calculate_distance_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> Dict:
@@ -1676,59 +2257,93 @@ class MeshPollingDaemon:
             'bearing': round(bearing, 1)
         }
     
-    async def _generate_data_files(self):
-        """Generate JavaScript/JSON data files for web interface"""
+    @staticmethod
+    def _calculate_distance_bearing_many(coords: List[Tuple[float, float, float, float]]) -> List[Dict]:
+        """Calculate distance and bearing for many (lat1, lon1, lat2, lon2) pairs
+
+        Uses numpy when it is installed, otherwise falls back to
+        _calculate_distance_bearing for each pair.
+        """
+        if np is None or not coords:
+            return [MeshPollingDaemon._calculate_distance_bearing(*c) for c in coords]
+        
+        lat1, lon1, lat2, lon2 = np.array(coords, dtype=np.float64).T
+        lat1_rad = np.radians(lat1)
+        lat2_rad = np.radians(lat2)
+        delta_lat = np.radians(lat2 - lat1)
+        delta_lon = np.radians(lon2 - lon1)
+        
+        # Haversine formula for distance
+        a = (np.sin(delta_lat / 2) ** 2 +
+             np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(delta_lon / 2) ** 2)
+        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+        distance_km = 6371 * c  # Earth radius in km
+        distance_miles = distance_km * 0.621371
+        
+        # Calculate bearing
+        y = np.sin(delta_lon) * np.cos(lat2_rad)
+        x = (np.cos(lat1_rad) * np.sin(lat2_rad) -
+             np.sin(lat1_rad) * np.cos(lat2_rad) * np.cos(delta_lon))
+        bearing = (np.degrees(np.arctan2(y, x)) + 360) % 360
+        
+        return [
+            {
+                'distanceKM': round(km, 2),
+                'distanceMiles': round(miles, 2),
+                'bearing': round(bear, 1)
+            }
+            for km, miles, bear in zip(distance_km.tolist(), distance_miles.tolist(), bearing.tolist())
+        ]
+    
+    async def _generate_data_files(self, all_nodes: Optional[List[Dict]] = None):
+        """Generate JavaScript/JSON data files for web interface
+
+        all_nodes is this cycle's node snapshot; it is read from the database
+        when not supplied.
+        """
         try:
-            data_dir = Path(self.config.get('json', 'jsonDir', 'data'))
-            data_dir.mkdir(parents=True, exist_ok=True)
+            data_dir = self.json_dir
+            # File system calls run in a worker thread so the event loop is
+            # not stalled while they block
+            await asyncio.to_thread(data_dir.mkdir, parents=True, exist_ok=True)
             
-            # Get all nodes from database
-            all_nodes = await self.db.get_all_nodes()
+            # Get all nodes from database unless the caller already has them
+            if all_nodes is None:
+                all_nodes = await self.db.get_all_nodes()
             
             # Apply retention filter if enabled
-            expire_enabled = self.config.get('retention', 'expireOldNodes', True)
-            expire_days = self.config.getint('retention', 'expireInterval', 30)
+            expire_enabled = self.expire_old_nodes
+            expire_days = self.expire_interval_days
             
+            # Normalize each row's last_seen to a unix timestamp once; the
+            # retention filter and protocol classification both reuse it
+            last_seen_ts = [_parse_last_seen(node.get('last_seen')) for node in all_nodes]
+
             if expire_enabled and expire_days > 0:
                 cutoff_time = datetime.now(timezone.utc) - timedelta(days=expire_days)
+                cutoff_ts = cutoff_time.timestamp()
                 self.logger.info(f"Filtering nodes: retention period is {expire_days} days (cutoff: {cutoff_time.isoformat()})")
                 
                 # Filter nodes based on last_seen timestamp
                 filtered_nodes = []
+                filtered_ts = []
                 excluded_count = 0
-                for node in all_nodes:
-                    last_seen_raw = node.get('last_seen')
-                    if last_seen_raw:
-                        # Parse last_seen to datetime
-                        if isinstance(last_seen_raw, datetime):
-                            last_seen_dt = last_seen_raw
-                            # Make timezone-aware if naive
-                            if last_seen_dt.tzinfo is None:
-                                last_seen_dt = last_seen_dt.replace(tzinfo=timezone.utc)
-                        elif isinstance(last_seen_raw, str):
-                            try:
-                                last_seen_dt = datetime.fromisoformat(last_seen_raw.replace('Z', '+00:00'))
-                            except:
-                                # If parsing fails, include the node (don't risk losing data)
-                                filtered_nodes.append(node)
-                                continue
-                        else:
-                            # Unknown format, include the node
-                            filtered_nodes.append(node)
-                            continue
-                        
-                        # Only include nodes seen within retention period
-                        if last_seen_dt >= cutoff_time:
-                            filtered_nodes.append(node)
-                        else:
-                            excluded_count += 1
-                            self.logger.debug(f"Excluding node {node.get('node', 'unknown')} ({node.get('wlan_ip')}): last seen {last_seen_dt.isoformat()}")
-                    else:
+                for node, ts in zip(all_nodes, last_seen_ts):
+                    if not node.get('last_seen'):
                         # No last_seen timestamp - exclude from JSON output
                         excluded_count += 1
                         self.logger.debug(f"Excluding node {node.get('node', 'unknown')} ({node.get('wlan_ip')}): no last_seen timestamp")
+                    elif ts is None or ts >= cutoff_ts:
+                        # Only include nodes seen within retention period. If parsing
+                        # failed, include the node (don't risk losing data)
+                        filtered_nodes.append(node)
+                        filtered_ts.append(ts)
+                    else:
+                        excluded_count += 1
+                        self.logger.debug(f"Excluding node {node.get('node', 'unknown')} ({node.get('wlan_ip')}): last seen {datetime.fromtimestamp(ts, timezone.utc).isoformat()}")
                 
                 all_nodes = filtered_nodes
+                last_seen_ts = filtered_ts
                 self.logger.info(f"Retention filter: kept {len(all_nodes)} nodes, excluded {excluded_count} nodes")
             else:
                 self.logger.info("Node retention filter disabled - including all database nodes")
@@ -1744,69 +2359,82 @@ class MeshPollingDaemon:
             }
             
             node_report = []
+            now_ts = time.time()
 
-            babel_count = 0
-            olsr_count = 0
-            combo_count = 0
+            protocol_counts: Counter = Counter()
+            legacy_loadavg = 0
+            total_nodes_in_db = 0  # nodes with any coordinate set
+            week_plus_old = 0  # nodes never seen
             
-            for node in all_nodes:
+            for node, node_ts in zip(all_nodes, last_seen_ts):
+                # Fields used more than once are read into locals up front
+                get = node.get
+                firmware_version = get('firmware_version', '')
+                mesh_supernode = get('mesh_supernode', 'false')
+
                 # Only include nodes with valid location data
-                lat = node.get('lat', 0)
-                lon = node.get('lon', 0)
+                lat = get('lat', 0)
+                lon = get('lon', 0)
                 
                 # Build node data for reporting
                 # Convert datetime to ISO 8601 UTC string
-                last_seen_raw = node.get('last_seen', '')
-                protocol = self._determine_protocol(node.get('firmware_version', ''), last_seen_raw)
+                last_seen_raw = get('last_seen', '')
+                if lat or lon:
+                    total_nodes_in_db += 1
+                if not last_seen_raw:
+                    week_plus_old += 1
+                protocol = self._determine_protocol(firmware_version, node_ts, now_ts)
 
                 # Convert to ISO 8601 UTC format for frontend
                 last_seen = _to_iso8601_utc(last_seen_raw)
                 
-                # Deserialize link_info from pickle if it's stored as hex string
+                # Deserialize link_info if it's stored as a string
                 link_info_data = {}
-                link_info_raw = node.get('link_info', '')
+                link_info_raw = get('link_info', '')
                 if link_info_raw and isinstance(link_info_raw, str):
-                    try:
-                        link_info_data = pickle.loads(bytes.fromhex(link_info_raw))
-                    except:
+                    link_info_data = _load_stored(link_info_raw)
+                    if not isinstance(link_info_data, dict):
                         link_info_data = {}
                 elif isinstance(link_info_raw, dict):
                     link_info_data = link_info_raw
 
                 # Fallback: if this is the localnode and DB lacked link_info, use the in-memory initial map
                 if (not link_info_data):
-                    if self.localnode_ip and node.get('wlan_ip') == self.localnode_ip:
+                    if self.localnode_ip and get('wlan_ip') == self.localnode_ip:
                         link_info_data = self.initial_link_map.get(self.localnode_ip, {})
-                    elif self.initial_link_map and node.get('node') == self.config.get('polling', 'localnode', 'localnode.local.mesh'):
+                    elif self.initial_link_map and get('node') == self.localnode:
                         # Fallback match by node name if IPs differ
                         # initial_link_map is keyed by localnode_ip; grab first (only) entry
                         first_entry = next(iter(self.initial_link_map.values()), {})
                         link_info_data = first_entry
                 
-                # Deserialize services from pickle if it's stored as hex string
+                # Deserialize services from the stored JSON (or legacy pickle hex)
                 services_data = []
-                services_raw = node.get('services', 'Not Available')
+                services_raw = get('services', 'Not Available')
                 if services_raw and isinstance(services_raw, str) and services_raw != 'Not Available':
-                    try:
-                        services_data = pickle.loads(bytes.fromhex(services_raw))
-                        # Ensure it's a list
-                        if not isinstance(services_data, list):
-                            services_data = []
-                    except:
+                    services_data = _load_stored(services_raw)
+                    # Ensure it's a list
+                    if not isinstance(services_data, list):
                         services_data = []
                 elif isinstance(services_raw, list):
                     services_data = services_raw
                 
-                # Deserialize loadavg from pickle if it's stored as hex string
+                # Deserialize loadavg from the stored JSON list
                 loadavg_data = [0, 0, 0]
-                loadavg_raw = node.get('loadavg', '')
+                loadavg_raw = get('loadavg', '')
                 if loadavg_raw and isinstance(loadavg_raw, str):
-                    try:
-                        loadavg_data = pickle.loads(bytes.fromhex(loadavg_raw))
-                        # Ensure it's a list with 3 elements
-                        if not isinstance(loadavg_data, list) or len(loadavg_data) != 3:
-                            loadavg_data = [0, 0, 0]
-                    except:
+                    if loadavg_raw[0] == '[':
+                        try:
+                            loadavg_data = _json_loads(loadavg_raw)
+                        except ValueError:
+                            loadavg_data = None
+                    else:
+                        # Legacy pickle hex from older versions; rewritten as
+                        # JSON the next time the node is polled
+                        legacy_loadavg += 1
+                        loadavg_data = _load_stored(loadavg_raw)
+                    # Ensure it's a list with 3 elements
+                    if not isinstance(loadavg_data, list) or len(loadavg_data) != 3:
                         loadavg_data = [0, 0, 0]
                 elif isinstance(loadavg_raw, list):
                     if len(loadavg_raw) == 3:
@@ -1815,40 +2443,39 @@ class MeshPollingDaemon:
                         loadavg_data = [0, 0, 0]
                 
                 # Clean description: remove HTML br tags and replace with space
-                description = node.get('description', '')
-                if description:
-                    import re
-                    description = re.sub(r'<br\s*/?>', ' ', description, flags=re.IGNORECASE)
+                description = get('description', '')
+                if description and '<' in description:
+                    description = _RE_BR.sub(' ', description)
                 
                 node_data = {
-                    'node': node.get('node', ''),
-                    'wlan_ip': node.get('wlan_ip', ''),
+                    'node': get('node', ''),
+                    'wlan_ip': get('wlan_ip', ''),
                     'lat': lat,
                     'lon': lon,
                     'description': description,
-                    'grid_square': node.get('grid_square', ''),
-                    'model': node.get('model', ''),
-                    'firmware_version': node.get('firmware_version', ''),
-                    'uptime': node.get('uptime', 'Not Available'),
+                    'grid_square': get('grid_square', ''),
+                    'model': get('model', ''),
+                    'firmware_version': firmware_version,
+                    'uptime': get('uptime', 'Not Available'),
                     'loadavg': loadavg_data,
-                    'ssid': node.get('ssid', 'None'),
-                    'channel': node.get('channel', 'None'),
-                    'chanbw': node.get('chanbw', 'None'),
-                    'freq': node.get('freq', 'None'),
-                    'active_tunnel_count': node.get('active_tunnel_count', '0'),
-                    'firmware_mfg': node.get('firmware_mfg', 'Not Available'),
-                    'board_id': node.get('board_id', 'Not Available'),
+                    'ssid': get('ssid', 'None'),
+                    'channel': get('channel', 'None'),
+                    'chanbw': get('chanbw', 'None'),
+                    'freq': get('freq', 'None'),
+                    'active_tunnel_count': get('active_tunnel_count', '0'),
+                    'firmware_mfg': get('firmware_mfg', 'Not Available'),
+                    'board_id': get('board_id', 'Not Available'),
                     'services': services_data if isinstance(services_data, list) else 'Not Available',
                     'link_info': link_info_data,
-                    'antGain': node.get('antGain', 0),
-                    'antBeam': node.get('antBeam', 0),
-                    'antDesc': node.get('antDesc', 'Not Available'),
-                    'mesh_supernode': node.get('mesh_supernode', 'false'),
-                    'mesh_gateway': node.get('mesh_gateway', 'false'),
+                    'antGain': get('antGain', 0),
+                    'antBeam': get('antBeam', 0),
+                    'antDesc': get('antDesc', 'Not Available'),
+                    'mesh_supernode': mesh_supernode,
+                    'mesh_gateway': get('mesh_gateway', 'false'),
                     'last_seen': last_seen,
                     'protocol': protocol,
-                    'response_time_ms': int(round(node.get('response_time_ms', 0.0))),
-                    'hopsAway': node.get('hopsAway', 1),
+                    'response_time_ms': int(round(get('response_time_ms', 0.0))),
+                    'hopsAway': get('hopsAway', 1),
                 }
                 
                 # Add node_data to both node_report and frequency-based categorization for map
@@ -1857,138 +2484,41 @@ class MeshPollingDaemon:
                 node_report.append(node_data)
 
                 # Track protocol counts for stats
-                if protocol == 'Babel Only':
-                    babel_count += 1
-                elif protocol == 'OLSR Only':
-                    olsr_count += 1
-                elif protocol == 'Combo':
-                    combo_count += 1
+                protocol_counts[protocol] += 1
                 
                 # Categorize by frequency band if location is available
                 if lat != 0 or lon != 0:
-                    is_supernode = node.get('mesh_supernode', 'false') == 'true'
-                    is_no_rf = node.get('meshRF', 'on') == 'off' or node.get('channel', 'none') == 'none'
-                    channel = node.get('channel', 'none')
-                    board_id = node.get('board_id', '')
+                    channel = get('channel', 'none')
+                    board_id = get('board_id', '')
                     
-                    if is_supernode:
+                    if mesh_supernode == 'true':
                         all_devices['supernode'].append(node_data)
-                    elif is_no_rf:
+                    elif get('meshRF', 'on') == 'off' or channel == 'none':
                         all_devices['noRF'].append(node_data)
-                    elif channel == 'none':
-                        all_devices['noRF'].append(node_data)
-                    elif board_id in ['0xe009', '0xe1b9', '0xe239']:  # 900MHz boards
+                    elif board_id in NodePoller.BAND_900_BOARD_IDS:
                         all_devices['900'].append(node_data)
-                    elif isinstance(channel, str) and channel.isdigit():
-                        ch = int(channel)
-                        if ch <= 11:  # 2.4GHz channels 1-11
-                            all_devices['2ghz'].append(node_data)
-                        elif (37 <= ch <= 64) or (100 <= ch <= 184) or ch >= 3000:  # 5GHz channels or 6GHz
-                            all_devices['5ghz'].append(node_data)
-                        elif 76 <= ch <= 99:  # 3GHz channels 76-99
-                            all_devices['3ghz'].append(node_data)
-                    elif isinstance(channel, int):
-                        if channel <= 11:  # 2.4GHz channels 1-11
-                            all_devices['2ghz'].append(node_data)
-                        elif (37 <= channel <= 64) or (100 <= channel <= 184) or channel >= 3000:  # 5GHz channels or 6GHz
-                            all_devices['5ghz'].append(node_data)
-                        elif 76 <= channel <= 99:  # 3GHz channels 76-99
-                            all_devices['3ghz'].append(node_data)
-            
-            # Generate map_data.js with all required variables
-            # Count nodes for statistics
-            total_nodes_in_db = len([n for n in all_nodes if n.get('lat') or n.get('lon')])
-            week_plus_old = len([n for n in all_nodes if not n.get('last_seen')])
-            
-            # Parse map tile servers from TOML config
-            map_tile_servers = {}
-            default_tile_server = None
-            priority_list: List[str] = []
-            
-            # Read tile servers and priority from single section
-            tileservers_config = self.config.get_section('tileservers')
-            if isinstance(tileservers_config, dict):
-                # Extract priority list
-                priority_list = tileservers_config.get('priority', [])
-                if not isinstance(priority_list, list):
-                    priority_list = []
-
-                # Flatten nested dicts created by dotted keys (e.g., aredn.W7SLZ)
-                def flatten(prefix: str, obj: Any):
-                    if isinstance(obj, dict):
-                        for k, v in obj.items():
-                            name = f"{prefix}.{k}" if prefix else str(k)
-                            flatten(name, v)
                     else:
-                        # Only accept string URLs
-                        if isinstance(obj, str):
-                            map_tile_servers[prefix] = obj
-
-                # Build map_tile_servers from tileservers_config (excluding 'priority')
-                for key, value in tileservers_config.items():
-                    if key == 'priority':
-                        continue
-                    flatten(key, value)
+                        bucket = _channel_bucket(channel)
+                        if bucket:
+                            all_devices[bucket].append(node_data)
             
-            # Determine default from priority list first
-            if priority_list:
-                for candidate in priority_list:
-                    if candidate in map_tile_servers:
-                        default_tile_server = candidate
-                        break
-            
-            # Fallback: first entry of ordered servers
-            if not default_tile_server and map_tile_servers:
-                default_tile_server = next(iter(map_tile_servers))
-            
-            # Reorder map_tile_servers honoring priority_list first
-            if priority_list:
-                ordered = {}
-                for name in priority_list:
-                    if name in map_tile_servers:
-                        ordered[name] = map_tile_servers[name]
-                for name, url in map_tile_servers.items():
-                    if name not in ordered:
-                        ordered[name] = url
-                map_tile_servers = ordered
-            
-            # Parse map center coordinates
-            map_center_lat = float(self.config.get('map', 'center_lat', 0))
-            map_center_lon = float(self.config.get('map', 'center_lon', 0))
-            
-            # Handle distanceUnits setting (default to miles if missing or invalid)
-            distance_units = self.config.get('map', 'distanceUnits', 'miles')
-            kilometers = distance_units == 'kilometers'
-            
-            map_info = {
-                'localnode': self.nodelistNode,
-                'lastUpdate': datetime.utcnow().replace(microsecond=0).strftime('%Y-%m-%dT%H:%M:%SZ'),
-                'mapTileServers': map_tile_servers,
-                'defaultTileServer': default_tile_server,
-                'title': self.config.get('map', 'browserTitle', 'MeshMap'),
-                'attribution': self.config.get('attribution', 'credit', ''),
-                'mapContact': self.config.get('map', 'contact', ''),
-                'kilometers': kilometers,
-                'webpageDataDir': '',
-                'mapCenterCoords': [map_center_lat, map_center_lon],
-                'mapInitialZoom': int(self.config.get('map', 'initial_zoom_level', 10)),
-                'totalNodesInDB': total_nodes_in_db,
-                'weekPlusOld': week_plus_old,
-                'reportBrowserTitle': self.config.get('attribution', 'browserTitle', 'Node Report'),
-                'reportPageTitle': self.config.get('attribution', 'pageTitle', 'Node Report')
-            }
+            if legacy_loadavg:
+                self.logger.warning(
+                    f"{legacy_loadavg} nodes still have pickled loadavg values from an older version; "
+                    f"they are stored as JSON once re-polled"
+                )
             
-            # Custom JSON encoder to handle Decimal types from MariaDB
-            def decimal_default(obj):
-                if isinstance(obj, Decimal):
-                    return float(obj)
-                raise TypeError(f"Object of type {type(obj)} is not JSON serializable")
+            # Generate map_data.js with all required variables
+            map_info = dict(self.map_info_template)
+            map_info['lastUpdate'] = datetime.now(timezone.utc).replace(tzinfo=None).isoformat(timespec='seconds') + 'Z'
+            map_info['totalNodesInDB'] = total_nodes_in_db
+            map_info['weekPlusOld'] = week_plus_old
             
             # Create map_data.json with all required data
             # Update protocol counts in stats before emitting outputs
-            self.stats['babelNodes'] = babel_count
-            self.stats['olsrNodes'] = olsr_count
-            self.stats['comboNodes'] = combo_count
+            self.stats['babelNodes'] = protocol_counts['Babel Only']
+            self.stats['olsrNodes'] = protocol_counts['OLSR Only']
+            self.stats['comboNodes'] = protocol_counts['Combo']
 
             map_data = {
                 "mapInfo": map_info,
@@ -1997,11 +2527,11 @@ class MeshPollingDaemon:
             }
             
             map_data_file = data_dir / 'map_data.json'
-            map_data_file.write_text(json.dumps(map_data, indent=2, default=decimal_default))
+            await asyncio.to_thread(_write_file_atomic, map_data_file, _dump_data_file(map_data))
             
             # Generate node_report_data.json
             node_report_file = data_dir / 'node_report_data.json'
-            node_report_file.write_text(json.dumps(node_report, indent=2, default=decimal_default))
+            await asyncio.to_thread(_write_file_atomic, node_report_file, _dump_data_file(node_report))
             
             self.logger.info(f"Generated data files in {data_dir}")
             
@@ -2043,23 +2573,102 @@ class MeshPollingDaemon:
         
         self.logger.info("Shutdown complete")
 
-    def _determine_protocol(self, firmware_version: str, last_seen_value: Any) -> str:
+    def _load_tile_servers(self) -> Tuple[Dict[str, str], Optional[str]]:
+        """Read tile servers from TOML config, ordered by priority, plus the default"""
+        map_tile_servers = {}
+        priority_list: List[str] = []
+        
+        # Read tile servers and priority from single section
+        tileservers_config = self.config.get_section('tileservers')
+        if isinstance(tileservers_config, dict):
+            # Extract priority list
+            priority_list = tileservers_config.get('priority', [])
+            if not isinstance(priority_list, list):
+                self.logger.warning(
+                    f"Ignoring tileservers.priority: expected a list of server names, got {priority_list!r}"
+                )
+                priority_list = []
+
+            # Flatten nested dicts created by dotted keys (e.g., aredn.W7SLZ)
+            def flatten(prefix: str, obj: Any):
+                if isinstance(obj, dict):
+                    for k, v in obj.items():
+                        name = f"{prefix}.{k}" if prefix else str(k)
+                        flatten(name, v)
+                else:
+                    # Only accept string URLs
+                    if isinstance(obj, str):
+                        map_tile_servers[prefix] = obj
+
+            # Build map_tile_servers from tileservers_config (excluding 'priority')
+            for key, value in tileservers_config.items():
+                if key == 'priority':
+                    continue
+                flatten(key, value)
+        
+        # Order servers by their first position in priority_list; the sort is
+        # stable, so unlisted servers follow in configured order
+        servers = list(map_tile_servers.items())
+        if priority_list:
+            rank: Dict[str, int] = {}
+            for index, name in enumerate(priority_list):
+                rank.setdefault(name, index)
+            unranked = len(priority_list)
+            servers.sort(key=lambda item: rank.get(item[0], unranked))
+            map_tile_servers = dict(servers)
+        
+        # The default is the first server in that order: the highest priority
+        # server that exists, else the first one configured
+        default_tile_server = servers[0][0] if servers else None
+        
+        return map_tile_servers, default_tile_server
+    
+    def _load_map_info(self) -> Dict[str, Any]:
+        """Build the static part of map_data.json's mapInfo from config
+
+        lastUpdate, totalNodesInDB and weekPlusOld are placeholders that
+        _generate_data_files fills in each cycle.
+        """
+        # Parse map center coordinates
+        map_center_lat = float(self.config.get('map', 'center_lat', 0))
+        map_center_lon = float(self.config.get('map', 'center_lon', 0))
+        
+        # Handle distanceUnits setting (default to miles if missing or invalid)
+        distance_units = self.config.get('map', 'distanceUnits', 'miles')
+        kilometers = distance_units == 'kilometers'
+        
+        return {
+            'localnode': self.nodelistNode,
+            'lastUpdate': None,
+            'mapTileServers': self.map_tile_servers,
+            'defaultTileServer': self.default_tile_server,
+            'title': self.config.get('map', 'browserTitle', 'MeshMap'),
+            'attribution': self.config.get('attribution', 'credit', ''),
+            'mapContact': self.config.get('map', 'contact', ''),
+            'kilometers': kilometers,
+            'webpageDataDir': '',
+            'mapCenterCoords': [map_center_lat, map_center_lon],
+            'mapInitialZoom': int(self.config.get('map', 'initial_zoom_level', 10)),
+            'totalNodesInDB': 0,
+            'weekPlusOld': 0,
+            'reportBrowserTitle': self.config.get('attribution', 'browserTitle', 'Node Report'),
+            'reportPageTitle': self.config.get('attribution', 'pageTitle', 'Node Report')
+        }
+    
+    def _determine_protocol(self, firmware_version: str, last_seen_value: Any, now: Optional[float] = None) -> str:
         """Classify node protocol as Babel Only / OLSR Only / Combo / Unknown."""
         last_seen_ts = _parse_last_seen(last_seen_value)
         if last_seen_ts is None:
             return "Unknown"
 
-        if last_seen_ts < time.time() - self.protocol_threshold_seconds:
+        if now is None:
+            now = time.time()
+        if last_seen_ts < now - self.protocol_threshold_seconds:
             return "Unknown"
 
-        if _is_firmware(firmware_version, 'babel', self.protocol_version_cutoff, self.protocol_nightly_cutoff):
-            return "Babel Only"
-        if _is_firmware(firmware_version, 'olsr', self.protocol_version_cutoff, self.protocol_nightly_cutoff):
-            return "OLSR Only"
-        if _is_firmware(firmware_version, 'combo', self.protocol_version_cutoff, self.protocol_nightly_cutoff):
-            return "Combo"
-
-        return "Unknown"
+        if not firmware_version or not isinstance(firmware_version, str):
+            return "Unknown"
+        return _firmware_protocol(firmware_version, self.protocol_version_cutoff, self.protocol_nightly_cutoff)
 
 
 # ============================================================================
@@ -2110,7 +2719,10 @@ For systemd integration, use the provided pollingScript.service file.
         
         # Create and run daemon
         daemon = MeshPollingDaemon(config, once=args.once)
-        asyncio.run(daemon.start())
+        if uvloop is not None:
+            uvloop.run(daemon.start())
+        else:
+            asyncio.run(daemon.start())
         
         sys.exit(0)
         
@@ -2143,21 +2755,13 @@ async def _flush_database(config: ConfigManager):
     print(f"Initializing MariaDB database '{sql_db}' with user '{sql_user}'...")
     
     try:
-        # Use sudo mariadb for root access (socket authentication)
-        print(f"Creating database '{sql_db}'...")
-        subprocess.run([
-            'sudo', 'mariadb', '-e',
-            f"CREATE DATABASE IF NOT EXISTS `{sql_db}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;"
-        ], check=True, capture_output=True, text=True)
-        
-        print(f"Setting up user '{sql_user}'...")
-        subprocess.run([
-            'sudo', 'mariadb', '-e',
-            f"CREATE USER IF NOT EXISTS '{sql_user}'@'localhost' IDENTIFIED BY '{sql_passwd}';"
-        ], check=True, capture_output=True, text=True)
-        
+        # Use sudo mariadb for root access (socket authentication); one client
+        # invocation runs all the setup statements in order
+        print(f"Creating database '{sql_db}' and setting up user '{sql_user}'...")
         subprocess.run([
             'sudo', 'mariadb', '-e',
+            f"CREATE DATABASE IF NOT EXISTS `{sql_db}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci; "
+            f"CREATE USER IF NOT EXISTS '{sql_user}'@'localhost' IDENTIFIED BY '{sql_passwd}'; "
             f"GRANT ALL PRIVILEGES ON `{sql_db}`.* TO '{sql_user}'@'localhost'; FLUSH PRIVILEGES;"
         ], check=True, capture_output=True, text=True)
         
@@ -2175,10 +2779,10 @@ async def _flush_database(config: ConfigManager):
         async with user_conn.cursor() as cur:
             # Drop existing tables
             print(f"Dropping existing tables...")
-            await cur.execute(f"DROP TABLE IF EXISTS `{sql_db_tbl_node}`")
-            await cur.execute(f"DROP TABLE IF EXISTS `{sql_db_tbl_map}`")
-            await cur.execute(f"DROP TABLE IF EXISTS `{sql_db_tbl_aredn}`")
-            await cur.execute(f"DROP TABLE IF EXISTS `{sql_db_tbl_hops}`")
+            await cur.execute(
+                f"DROP TABLE IF EXISTS `{sql_db_tbl_node}`, `{sql_db_tbl_map}`, "
+                f"`{sql_db_tbl_aredn}`, `{sql_db_tbl_hops}`"
+            )
             
             # Create node_info table
             print(f"Creating table '{sql_db_tbl_node}'...")
@@ -2217,26 +2821,10 @@ async def _flush_database(config: ConfigManager):
                     `antDesc` VARCHAR(255) DEFAULT NULL,
                     `antBuiltin` VARCHAR(10) DEFAULT 'false',
                     `response_time_ms` FLOAT DEFAULT 0.0,
-                    INDEX `idx_node` (`node`),
-                    INDEX `idx_hops` (`hopsAway`),
                     INDEX `idx_last_seen` (`last_seen`)
                 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
             """)
             
-            # Add response_time_ms column if it doesn't exist (migration for existing databases)
-            print(f"Ensuring response_time_ms column exists in '{sql_db_tbl_node}'...")
-            try:
-                await cur.execute(f"""
-                    ALTER TABLE `{sql_db_tbl_node}` 
-                    ADD COLUMN `response_time_ms` FLOAT DEFAULT 0.0
-                """)
-                print("Column response_time_ms added successfully.")
-            except Exception as e:
-                # Column likely already exists, that's fine
-                if "Duplicate column name" not in str(e):
-                    print(f"Note: Could not add response_time_ms column: {e}")
-
-            
             # Create map_info table
             print(f"Creating table '{sql_db_tbl_map}'...")
             await cur.execute(f"""
@@ -0,0 +1,476 @@
+"""Tests for meshmapPoller
+
+Run from the backend directory with: python -m unittest discover -s tests
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import meshmapPoller as mp  # noqa: E402
+
+
+class FakeCursor:
+    """Cursor double that rejects any statement containing a bad row"""
+
+    def __init__(self, bad_keys, lock_conflicts=0):
+        self.bad_keys = bad_keys
+        self.lock_conflicts = lock_conflicts
+        self.executemany_calls = 0
+        self.written = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def _check(self, row):
+        if any(value in self.bad_keys for value in row):
+            raise RuntimeError(1406, "Data too long for column")
+
+    async def executemany(self, sql, rows):
+        self.executemany_calls += 1
+        if self.lock_conflicts:
+            self.lock_conflicts -= 1
+            raise RuntimeError(1213, "Deadlock found when trying to get lock")
+        for row in rows:
+            self._check(row)
+        self.written.extend(rows)
+
+    async def execute(self, sql, row=None):
+        self._check(row)
+        self.written.append(row)
+
+
+class FakeConnection:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def cursor(self, *args):
+        return self._cursor
+
+
+class FakeAcquire:
+    def __init__(self, conn):
+        self.conn = conn
+
+    async def __aenter__(self):
+        return self.conn
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakePool:
+    def __init__(self, cursor):
+        self.conn = FakeConnection(cursor)
+
+    def acquire(self):
+        return FakeAcquire(self.conn)
+
+
+def make_adapter(bad_keys=(), lock_conflicts=0):
+    cursor = FakeCursor(set(bad_keys), lock_conflicts)
+    adapter = mp.MySQLAdapter(config=None)
+    adapter.pool = FakePool(cursor)
+    return adapter, cursor
+
+
+class BatchWriteFallbackTests(unittest.IsolatedAsyncioTestCase):
+    async def test_upsert_batch_keeps_good_rows_when_one_row_fails(self):
+        adapter, cursor = make_adapter(bad_keys={'10.0.0.2'})
+        nodes = [mp.NodeInfo(node=f"n{i}", wlan_ip=f"10.0.0.{i}") for i in range(1, 5)]
+
+        with self.assertLogs(level='ERROR') as logs:
+            failed = await adapter.upsert_nodes_batch(nodes)
+
+        self.assertEqual(failed, 1)
+        self.assertEqual(cursor.executemany_calls, 1)
+        self.assertEqual(sorted(row[1] for row in cursor.written), ['10.0.0.1', '10.0.0.3', '10.0.0.4'])
+        self.assertTrue(any('10.0.0.2' in line for line in logs.output))
+
+    async def test_upsert_batch_writes_once_when_all_rows_are_good(self):
+        adapter, cursor = make_adapter()
+        nodes = [mp.NodeInfo(node=f"n{i}", wlan_ip=f"10.0.0.{i}") for i in range(1, 4)]
+
+        self.assertEqual(await adapter.upsert_nodes_batch(nodes), 0)
+        self.assertEqual(cursor.executemany_calls, 1)
+        self.assertEqual(len(cursor.written), 3)
+
+    async def test_link_info_batch_keeps_good_rows_when_one_row_fails(self):
+        adapter, cursor = make_adapter(bad_keys={'10.0.0.3'})
+        items = [(f"10.0.0.{i}", '{}') for i in range(1, 5)]
+
+        with self.assertLogs(level='ERROR') as logs:
+            failed = await adapter.update_link_info_batch(items)
+
+        self.assertEqual(failed, 1)
+        self.assertEqual(sorted(ip for ip, _ in cursor.written), ['10.0.0.1', '10.0.0.2', '10.0.0.4'])
+        self.assertTrue(any('10.0.0.3' in line for line in logs.output))
+
+    async def test_batch_is_rerun_after_a_deadlock(self):
+        adapter, cursor = make_adapter(lock_conflicts=1)
+        nodes = [mp.NodeInfo(node=f"n{i}", wlan_ip=f"10.0.0.{i}") for i in range(1, 4)]
+
+        with self.assertLogs(level='WARNING'):
+            failed = await adapter.upsert_nodes_batch(nodes)
+
+        self.assertEqual(failed, 0)
+        self.assertEqual(cursor.executemany_calls, 2)
+        self.assertEqual(len(cursor.written), 3)
+
+
+def make_daemon():
+    """Build a daemon without reading settings; only for methods that need no config"""
+    daemon = object.__new__(mp.MeshPollingDaemon)
+    daemon.logger = mp.logging.getLogger('test_meshmapPoller')
+    return daemon
+
+
+class WriteInBatchesTests(unittest.IsolatedAsyncioTestCase):
+    async def test_chunks_are_sorted_by_key(self):
+        daemon = make_daemon()
+        daemon.NODE_WRITE_BATCH_SIZE = 2
+        chunks = []
+
+        async def writer(chunk):
+            chunks.append(chunk)
+            return 0
+
+        await daemon._write_in_batches(writer, ['d', 'b', 'a', 'e', 'c'], key=str)
+
+        self.assertEqual(sorted(chunks), [['a', 'b'], ['c', 'd'], ['e']])
+
+    async def test_failed_chunk_is_logged_and_others_still_written(self):
+        daemon = make_daemon()
+        daemon.NODE_WRITE_BATCH_SIZE = 2
+        written = []
+
+        async def writer(chunk):
+            if 'c' in chunk:
+                raise RuntimeError("boom")
+            written.extend(chunk)
+            return 0
+
+        with self.assertLogs('test_meshmapPoller', level='ERROR') as logs:
+            await daemon._write_in_batches(writer, ['a', 'b', 'c', 'd', 'e'], key=str)
+
+        self.assertEqual(sorted(written), ['a', 'b', 'e'])
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('2/3', logs.output[0])
+
+
+class FakeConfig:
+    def get(self, section, key, fallback=None):
+        return fallback
+
+
+# Column order of MySQLAdapter._node_row, taken from the upsert itself
+UPSERT_COLUMNS = [
+    column.strip()
+    for column in mp.MySQLAdapter.UPSERT_NODE_SQL.split('(', 1)[1].split(')', 1)[0].split(',')
+]
+
+
+class FakeNodeStore:
+    """In-memory node_info table applying the upsert's column resets
+
+    Every column takes the new value except link_info, which the upsert's
+    COALESCE keeps when the new value is empty.
+    """
+
+    def __init__(self, rows):
+        self.rows = {row['wlan_ip']: dict(row) for row in rows}
+        self.link_updates = []
+
+    async def upsert_nodes_batch(self, nodes):
+        for n in nodes:
+            values = dict(zip(UPSERT_COLUMNS, mp.MySQLAdapter._node_row(n)))
+            row = self.rows.setdefault(n.wlan_ip, {})
+            if values['link_info'] is None:
+                values['link_info'] = row.get('link_info')
+            row.update(values)
+        return 0
+
+    async def update_link_info_batch(self, items):
+        self.link_updates.append(list(items))
+        for wlan_ip, link_str in items:
+            self.rows[wlan_ip]['link_info'] = link_str
+        return 0
+
+    async def get_all_nodes(self):
+        return [dict(row) for row in self.rows.values()]
+
+
+class LinkTopologyTests(unittest.IsolatedAsyncioTestCase):
+    def make_topology_daemon(self, store):
+        daemon = make_daemon()
+        daemon.config = FakeConfig()
+        daemon.db = store
+        daemon.stats = {}
+        daemon.localnode_ip = None
+        daemon.initial_link_map = {}
+        return daemon
+
+    async def run_cycle(self, daemon, store, polled):
+        """Topology refresh for every node, then store the polled nodes"""
+        topology = {ip: {'hopsAway': 0, 'link_info': {}} for ip in store.rows}
+        await daemon._update_topology_info(topology)
+        await store.upsert_nodes_batch(polled)
+        return await daemon._build_link_topology()
+
+    def polled(self, ip, lat, lon, links=None):
+        return mp.NodeInfo(
+            node=ip, wlan_ip=ip, lat=lat, lon=lon,
+            link_info=mp._dump_stored(links) if links else "",
+        )
+
+    async def test_only_links_changed_by_enrichment_are_written(self):
+        old_links = mp._dump_stored({'10.0.0.1': {'destinationIP': '10.0.0.1', 'linkType': 'RF'}})
+        store = FakeNodeStore([
+            {'wlan_ip': ip, 'lat': 0, 'lon': 0, 'link_info': old_links if ip == '10.0.0.2' else None}
+            for ip in ('10.0.0.1', '10.0.0.2', '10.0.0.3')
+        ])
+        daemon = self.make_topology_daemon(store)
+
+        nodes = await self.run_cycle(daemon, store, [
+            # Links to a located node gain coordinates and must be stored
+            self.polled('10.0.0.1', 47.6, -122.3, {'10.0.0.2': {'destinationIP': '10.0.0.2', 'linkType': 'RF'}}),
+            # Reports no links this cycle
+            self.polled('10.0.0.2', 47.7, -122.2),
+            # Only links to an unknown node: enrichment adds nothing, so no rewrite
+            self.polled('10.0.0.3', 47.8, -122.1, {'10.9.9.9': {'destinationIP': '10.9.9.9', 'linkType': 'DTD'}}),
+        ])
+
+        self.assertEqual([[ip for ip, _ in batch] for batch in store.link_updates], [['10.0.0.1']])
+        by_ip = {node['wlan_ip']: node for node in nodes}
+        self.assertIn('linkLat', by_ip['10.0.0.1']['link_info']['10.0.0.2'])
+        # The topology refresh replaced the old links of the node that now reports none
+        self.assertEqual(store.rows['10.0.0.2']['link_info'], '{}')
+
+    async def test_topology_refresh_resets_unpolled_nodes(self):
+        enriched = mp._dump_stored({'10.0.0.2': {'destinationIP': '10.0.0.2', 'linkLat': 47.7}})
+        store = FakeNodeStore([
+            {'wlan_ip': '10.0.0.1', 'lat': 47.6, 'lon': -122.3, 'link_info': enriched},
+            {'wlan_ip': '10.0.0.2', 'lat': 47.7, 'lon': -122.2, 'link_info': None},
+        ])
+        daemon = self.make_topology_daemon(store)
+
+        await self.run_cycle(daemon, store, polled=[])
+
+        self.assertEqual(store.rows['10.0.0.1']['link_info'], '{}')
+        self.assertEqual((store.rows['10.0.0.1']['lat'], store.rows['10.0.0.1']['lon']), (0.0, 0.0))
+        self.assertEqual(store.link_updates, [])
+
+
+def make_poller(answering_urls):
+    """NodePoller whose fetches succeed only for answering_urls, recording every URL tried"""
+    poller = mp.NodePoller(session=None, logger=mp.logging.getLogger('test_meshmapPoller'))
+    poller.tried = []
+
+    async def fetch(url, retries=mp.NodePoller.MAX_RETRIES, timeout=None):
+        poller.tried.append((url, timeout) if timeout else url)
+        if url in answering_urls:
+            return {'node': 'n1', 'lat': 47.6, 'lon': -122.3}, url
+        return None, url
+
+    poller._fetch_json_from = fetch
+    return poller
+
+
+class PollNodeEndpointTests(unittest.IsolatedAsyncioTestCase):
+    def urls(self, ip):
+        return [t.format(ip=ip) for t in mp.NodePoller._SYSINFO_TEMPLATES]
+
+    async def test_primary_endpoint_is_tried_alone_first(self):
+        primary = self.urls('10.0.0.1')[0]
+        poller = make_poller({primary})
+
+        self.assertIsNotNone(await poller.poll_node('10.0.0.1'))
+        self.assertEqual(poller.tried, [primary])
+
+    async def test_fallbacks_are_raced_only_after_primary_fails(self):
+        primary, *fallbacks = self.urls('10.0.0.1')
+        poller = make_poller({fallbacks[-1]})
+
+        self.assertIsNotNone(await poller.poll_node('10.0.0.1'))
+        self.assertEqual(poller.tried[0], primary)
+        self.assertEqual(sorted(poller.tried[1:]), sorted(fallbacks))
+        self.assertEqual(poller._url_cache['10.0.0.1'], fallbacks[-1])
+
+    async def test_dead_cached_url_gets_a_short_probe_and_is_dropped(self):
+        primary, *fallbacks = self.urls('10.0.0.1')
+        poller = make_poller({primary})
+        poller._url_cache['10.0.0.1'] = fallbacks[0]
+
+        self.assertIsNotNone(await poller.poll_node('10.0.0.1'))
+        self.assertEqual(poller.tried, [(fallbacks[0], poller._cached_url_timeout), primary])
+        self.assertEqual(poller._url_cache['10.0.0.1'], primary)
+
+
+class FakeMeshPoller:
+    """poll_node double; offline(n) and congested(n) decide the fate of the n-th poll"""
+
+    def __init__(self, offline=lambda n: False, congested=lambda n: False):
+        self.offline = offline
+        self.congested = congested
+        self.congested_hosts = set()
+        self.polled = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def poll_node(self, ip, hops=0):
+        n = self.polled
+        self.polled += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            if self.offline(n):
+                # Never answers: slower than a live node but not congestion
+                await asyncio.sleep(0.01)
+                return None
+            await asyncio.sleep(0.002)
+            if self.congested(n):
+                self.congested_hosts.add(ip)
+                return None
+            return mp.NodeInfo(wlan_ip=ip, hopsAway=hops)
+        finally:
+            self.in_flight -= 1
+
+
+class RaisingSession:
+    """aiohttp session double whose requests all fail with error"""
+
+    def __init__(self, error):
+        self.error = error
+
+    def get(self, url, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        raise self.error
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class CongestionSignalTests(unittest.IsolatedAsyncioTestCase):
+    async def fetch(self, error, **kwargs):
+        poller = mp.NodePoller(session=RaisingSession(error), logger=mp.logging.getLogger('test_meshmapPoller'))
+        await poller._fetch_json_from("http://10.0.0.1/a/sysinfo", retries=0, **kwargs)
+        return poller.congested_hosts
+
+    async def test_connect_timeout_is_an_offline_node(self):
+        self.assertEqual(await self.fetch(mp.NodePoller._CONNECT_TIMEOUT_ERRORS[0]()), set())
+
+    async def test_timeout_after_connecting_is_congestion(self):
+        self.assertEqual(await self.fetch(asyncio.TimeoutError()), {'10.0.0.1'})
+
+    async def test_dropped_connection_is_congestion(self):
+        self.assertEqual(await self.fetch(mp.aiohttp.ServerDisconnectedError()), {'10.0.0.1'})
+
+    async def test_short_cached_probe_timeout_is_not_congestion(self):
+        poller_timeout = mp.aiohttp.ClientTimeout(total=mp.NodePoller.CACHED_URL_TIMEOUT)
+        self.assertEqual(await self.fetch(asyncio.TimeoutError(), timeout=poller_timeout), set())
+
+
+class AdaptiveConcurrencyTests(unittest.IsolatedAsyncioTestCase):
+    def make_polling_daemon(self, node_poller):
+        daemon = make_daemon()
+        daemon.db = FakeNodeStore([])
+        daemon.node_poller = node_poller
+        daemon.shutdown_event = asyncio.Event()
+        daemon.stats = {'nodesWithErrors': 0}
+        daemon.cycle_count = 1
+        daemon.parallel_threads = 60
+        daemon.adaptive_concurrency = True
+        daemon.adaptive_start_threads = 8
+        daemon.adaptive_step = 10
+        daemon.adaptive_window = 20
+        daemon.adaptive_low_error_rate = 0.05
+        daemon.adaptive_high_error_rate = 0.2
+        daemon.adaptive_backoff = 0.5
+        return daemon
+
+    async def poll(self, daemon, count):
+        """Poll count nodes; return the final limit and the (old, new) limit changes"""
+        nodes = {f"10.0.{i // 250}.{i % 250 + 1}": {'hopsAway': 1} for i in range(count)}
+        with self.assertLogs('test_meshmapPoller', level='DEBUG') as logs:
+            await daemon._poll_all_nodes(nodes)
+        finished = [line for line in logs.output if 'Adaptive polling finished at' in line]
+        changes = [
+            tuple(int(v) for v in line.split('concurrency ')[1].split(' -> '))
+            for line in logs.output if 'Adaptive polling: ' in line
+        ]
+        return int(finished[-1].split('finished at ')[1].split()[0]), changes
+
+    async def final_limit(self, daemon, count):
+        return (await self.poll(daemon, count))[0]
+
+    async def test_steady_share_of_offline_nodes_does_not_shrink_the_limit(self):
+        # Two of every five nodes stay offline for the whole cycle
+        poller = FakeMeshPoller(offline=lambda n: n % 5 < 2)
+        daemon = self.make_polling_daemon(poller)
+
+        self.assertEqual(await self.final_limit(daemon, 600), daemon.parallel_threads)
+        self.assertGreater(poller.peak, daemon.adaptive_start_threads)
+
+    async def test_congestion_never_shrinks_below_start_threads(self):
+        poller = FakeMeshPoller(congested=lambda n: n >= 300)
+        daemon = self.make_polling_daemon(poller)
+
+        # The clean first half grows the limit; the congested half backs it off to the floor
+        self.assertEqual(await self.final_limit(daemon, 600), daemon.adaptive_start_threads)
+        self.assertGreater(poller.peak, daemon.adaptive_start_threads)
+
+    async def test_one_congestion_burst_backs_off_once(self):
+        # Enough congested polls for three windows, all launched at the same limit
+        poller = FakeMeshPoller(congested=lambda n: 300 <= n < 360)
+        daemon = self.make_polling_daemon(poller)
+
+        _, changes = await self.poll(daemon, 600)
+
+        decreases = [(old, new) for old, new in changes if new < old]
+        self.assertEqual(len(decreases), 1)
+
+
+class WriteFileAtomicTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / 'map_data.json'
+
+    def test_replacement_keeps_existing_mode(self):
+        self.path.write_bytes(b'old')
+        os.chmod(self.path, 0o640)
+
+        mp._write_file_atomic(self.path, b'new')
+
+        self.assertEqual(self.path.read_bytes(), b'new')
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+
+    def test_new_file_is_world_readable(self):
+        mp._write_file_atomic(self.path, b'new')
+
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+
+    def test_failed_write_leaves_old_file_and_no_temp_file(self):
+        self.path.write_bytes(b'old')
+
+        with mock.patch.object(mp.os, 'replace', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                mp._write_file_atomic(self.path, b'new')
+
+        self.assertEqual(self.path.read_bytes(), b'old')
+        self.assertEqual(os.listdir(self.path.parent), ['map_data.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()